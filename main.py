@@ -1,6 +1,13 @@
+import asyncio
+import sys
+import time
+from typing import Awaitable, Optional
+
 from fastmcp import FastMCP
 from src.middleware.register_middleware import register_all_middleware
+from src.middleware.usage_middleware import flush_usage_stats
 from src.tools.repo.repo_tools import register_repo_tools
+from src.utils import github_client
 from src.utils.logging import get_logger
 
 # Initialize logger
@@ -10,14 +17,97 @@ logger = get_logger(__name__)
 logger.info("Initializing GitHub Reader MCP Server")
 mcp = FastMCP(name="GitHub Reader MCP Server")
 
-# Register middleware first
-logger.info("Registering middleware")
-register_all_middleware(mcp)
+registration_start = time.perf_counter()
 
-# Register all repo tools
+# Register all repo tools first so middleware can inspect their tags
 logger.info("Registering repo tools")
 register_repo_tools(mcp)
 
+# Register middleware
+logger.info("Registering middleware")
+register_all_middleware(mcp)
+
+# Registration is CPU-only (no I/O), so it runs sequentially; log its cost
+# so startup regressions are visible
+logger.info(
+    "Registration complete",
+    extra={
+        "execution_time_ms": (time.perf_counter() - registration_start) * 1000,
+        "extra_fields": {}
+    }
+)
+
+
+def install_uvloop() -> bool:
+    """
+    Switch asyncio to the uvloop event loop policy when uvloop is installed.
+
+    Returns:
+        True if uvloop was installed, False if unavailable on this platform
+    """
+    if sys.platform == "win32":
+        return False
+
+    try:
+        import uvloop
+    except ImportError:
+        return False
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
+async def serve_http2(
+    server: FastMCP,
+    host: str,
+    port: int,
+    certfile: Optional[str] = None,
+    keyfile: Optional[str] = None
+) -> None:
+    """
+    Serve the MCP HTTP app with Hypercorn, which supports HTTP/2.
+
+    Uvicorn (used by FastMCP's HTTP transport) only speaks HTTP/1.1, so
+    HTTP/2 multiplexing needs a different ASGI server. With a certificate
+    and key, Hypercorn serves TLS and negotiates h2 via ALPN, which is what
+    regular HTTP/2 clients expect. Without them it serves cleartext, where
+    only clients using h2c with prior knowledge get HTTP/2.
+
+    Args:
+        server: FastMCP server instance
+        host: Interface to bind
+        port: Port to bind
+        certfile: PEM certificate for TLS (optional)
+        keyfile: PEM private key for TLS (optional)
+    """
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config
+
+    hypercorn_config = Config()
+    hypercorn_config.bind = [f"{host}:{port}"]
+    if certfile and keyfile:
+        hypercorn_config.certfile = certfile
+        hypercorn_config.keyfile = keyfile
+
+    await serve(server.http_app(), hypercorn_config)
+
+
+async def run_until_shutdown(serve: Awaitable[None]) -> None:
+    """
+    Run a transport, then close the shared GitHub client session.
+
+    The session is bound to the event loop, so it has to be closed on that
+    loop before the transport's event loop exits.
+
+    Args:
+        serve: Coroutine running the server until shutdown
+    """
+    try:
+        await serve
+    finally:
+        await github_client.close_session()
+
+
 if __name__ == "__main__":
     import os
 
@@ -37,21 +127,50 @@ if __name__ == "__main__":
     try:
         if transport == "http":
             port = int(os.getenv("PORT", "8000"))
+            http_version = os.getenv("MCP_HTTP_VERSION", "1.1")
+            uvloop_enabled = install_uvloop()
+
+            if http_version == "h2":
+                try:
+                    import hypercorn  # noqa: F401
+                except ImportError:
+                    logger.warning(
+                        "MCP_HTTP_VERSION=h2 requires hypercorn; falling back to HTTP/1.1",
+                        extra={
+                            "extra_fields": {
+                                "http_version": http_version
+                            }
+                        }
+                    )
+                    http_version = "1.1"
+
             logger.info(
                 f"Server starting on HTTP transport at 0.0.0.0:{port}",
                 extra={
                     "extra_fields": {
                         "transport": "http",
                         "host": "0.0.0.0",
-                        "port": port
+                        "port": port,
+                        "http_version": http_version,
+                        "uvloop": uvloop_enabled
                     }
                 }
             )
-            mcp.run(
-                transport="http",
-                host="0.0.0.0",
-                port=port
-            )
+
+            if http_version == "h2":
+                asyncio.run(run_until_shutdown(serve_http2(
+                    mcp,
+                    "0.0.0.0",
+                    port,
+                    certfile=os.getenv("MCP_TLS_CERTFILE"),
+                    keyfile=os.getenv("MCP_TLS_KEYFILE")
+                )))
+            else:
+                asyncio.run(run_until_shutdown(mcp.run_async(
+                    transport="http",
+                    host="0.0.0.0",
+                    port=port
+                )))
         else:
             logger.info(
                 "Server starting on stdio transport",
@@ -61,7 +180,7 @@ if __name__ == "__main__":
                     }
                 }
             )
-            mcp.run(transport="stdio")
+            asyncio.run(run_until_shutdown(mcp.run_async(transport="stdio")))
     except Exception as e:
         logger.error(
             f"Server failed to start: {str(e)}",
@@ -75,4 +194,6 @@ if __name__ == "__main__":
         )
         raise
     finally:
+        # Compact usage events still waiting for the next compaction
+        flush_usage_stats()
         logger.info("Server shutdown")
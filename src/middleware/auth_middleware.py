@@ -1,19 +1,30 @@
-import uuid
+import logging
+from typing import FrozenSet
+
 from fastmcp.server.middleware import Middleware, MiddlewareContext
 from fastmcp.exceptions import ToolError
 from fastmcp.tools.tool import ToolResult
 from mcp import types as mt
 
-from ..utils.config import config
-from ..utils.logging import get_logger
+from ..utils import config as github_config
+from ..utils.fastuuid import new_request_id
+from ..utils.logging import get_structured_logger
+from ..utils.request_context import REQUEST_ID
 
 
-logger = get_logger(__name__)
+logger = get_structured_logger(__name__, middleware="auth")
 
 
 class GitHubAuthMiddleware(Middleware):
     """Middleware to validate GitHub API authentication."""
 
+    def __init__(self, auth_required: FrozenSet[str] = frozenset()):
+        """
+        Args:
+            auth_required: Names of tools that require a GitHub token
+        """
+        self._auth_required = auth_required
+
     async def on_call_tool(
         self,
         context: MiddlewareContext[mt.CallToolRequestParams],
@@ -32,55 +43,46 @@ class GitHubAuthMiddleware(Middleware):
         Raises:
             ToolError: If API key is missing for tools with "api" tag
         """
-        # Get or generate request_id for tracking
-        request_id = getattr(context, 'request_id', str(uuid.uuid4()))
+        log_debug = logger.isEnabledFor(logging.DEBUG)
+        log_info = logger.isEnabledFor(logging.INFO)
+
+        # Reuse the request_id set by the usage middleware, generating one only if absent
+        request_id = REQUEST_ID.get(None) or new_request_id()
 
         # Get the tool being called
-        tool_name = context.source.name if hasattr(context.source, 'name') else str(context.source)
-
-        logger.debug(
-            f"Auth middleware checking tool: {tool_name}",
-            extra={
-                "request_id": request_id,
-                "extra_fields": {
-                    "tool_name": tool_name,
-                    "has_api_key": config.is_configured()
-                }
-            }
-        )
-
-        # Check if the tool has "api" tag by getting tool metadata from FastMCP context
+        try:
+            tool_name = context.source.name
+        except AttributeError:
+            tool_name = str(context.source)
+
+        if log_debug:
+            logger.debug(
+                "Auth middleware checking tool: %s",
+                tool_name,
+                request_id=request_id,
+                tool_name=tool_name,
+                has_api_key=github_config.IS_CONFIGURED
+            )
+
         # Tools with "api" tag require authentication
-        fastmcp_ctx = context.fastmcp_context
-
-        # Get tool from server's registered tools
-        if hasattr(fastmcp_ctx, 'server'):
-            tool = fastmcp_ctx.server.get_tool(tool_name)
-
-            # Check if tool has "api" tag
-            if tool and hasattr(tool, 'tags') and "api" in tool.tags:
-                if not config.is_configured():
-                    logger.error(
-                        f"GitHub token not configured for tool: {tool_name}",
-                        extra={
-                            "request_id": request_id,
-                            "extra_fields": {
-                                "tool_name": tool_name,
-                                "requires_auth": True
-                            }
-                        }
-                    )
-                    raise ToolError("GitHub token not configured. Please set GITHUB_TOKEN in your .env file.")
+        if tool_name in self._auth_required:
+            if not github_config.IS_CONFIGURED:
+                logger.error(
+                    "GitHub token not configured for tool: %s",
+                    tool_name,
+                    request_id=request_id,
+                    tool_name=tool_name,
+                    requires_auth=True
+                )
+                raise ToolError("GitHub token not configured. Please set GITHUB_TOKEN in your .env file.")
 
+            if log_info:
                 logger.info(
-                    f"Authentication validated for tool: {tool_name}",
-                    extra={
-                        "request_id": request_id,
-                        "extra_fields": {
-                            "tool_name": tool_name,
-                            "auth_status": "valid"
-                        }
-                    }
+                    "Authentication validated for tool: %s",
+                    tool_name,
+                    request_id=request_id,
+                    tool_name=tool_name,
+                    auth_status="valid"
                 )
 
         # Continue to next middleware
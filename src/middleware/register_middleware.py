@@ -1,3 +1,5 @@
+from typing import FrozenSet
+
 from fastmcp import FastMCP
 
 from .auth_middleware import GitHubAuthMiddleware
@@ -8,25 +10,56 @@ from ..utils.logging import get_logger
 logger = get_logger(__name__)
 
 
+def _collect_auth_required_tools(server: FastMCP) -> FrozenSet[str]:
+    """
+    Collect the names of registered tools tagged "api".
+
+    Args:
+        server: FastMCP server instance with tools already registered
+
+    Returns:
+        Names of tools that require a GitHub token
+    """
+    tools = server._tool_manager._tools.values()
+    return frozenset(tool.name for tool in tools if "api" in getattr(tool, "tags", ()))
+
+
 def register_all_middleware(server: FastMCP) -> None:
     """
     Register all middleware in the correct order.
 
+    Tools must be registered before calling this, since the set of tools
+    requiring authentication is resolved once here instead of per call.
+
     Middleware order matters:
-    1. GitHubAuthMiddleware - Validates authentication first
-    2. GitHubUsageTrackingMiddleware - Tracks usage after auth
+    1. GitHubUsageTrackingMiddleware - Runs outermost so it sets the request ID
+       and also times calls rejected by auth
+    2. GitHubAuthMiddleware - Validates authentication before the tool runs;
+       only installed when at least one tool is tagged "api"
 
     Args:
         server: FastMCP server instance
     """
     logger.info("Registering middleware...")
 
-    # Register authentication middleware first
-    server.add_middleware(GitHubAuthMiddleware())
-    logger.info("Registered GitHubAuthMiddleware")
-
-    # Register usage tracking middleware second
+    # Register usage tracking middleware first
     server.add_middleware(GitHubUsageTrackingMiddleware())
     logger.info("Registered GitHubUsageTrackingMiddleware")
 
+    auth_required = _collect_auth_required_tools(server)
+
+    # Register authentication middleware second, unless nothing needs it
+    if auth_required:
+        server.add_middleware(GitHubAuthMiddleware(auth_required=auth_required))
+        logger.info(
+            "Registered GitHubAuthMiddleware",
+            extra={
+                "extra_fields": {
+                    "auth_required_tools": sorted(auth_required)
+                }
+            }
+        )
+    else:
+        logger.info("Skipped GitHubAuthMiddleware: no tools tagged \"api\"")
+
     logger.info("All middleware registered successfully")
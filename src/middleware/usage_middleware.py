@@ -1,22 +1,273 @@
+import asyncio
+import logging
 import time
-import uuid
+from collections import defaultdict, deque
 from datetime import datetime, timezone
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Set, Tuple
 
 from fastmcp.server.middleware import Middleware, MiddlewareContext
 from fastmcp.tools.tool import ToolResult
 from mcp import types as mt
 
-from ..utils.logging import get_logger
-from ..utils.storage import save_to_database, load_from_database
+from ..utils.fastuuid import new_request_id
+from ..utils.logging import get_structured_logger
+from ..utils.request_context import REQUEST_ID
+from ..utils.storage import (
+    append_to_log,
+    load_from_database,
+    read_log,
+    save_to_database,
+    truncate_log,
+)
 
 
-logger = get_logger(__name__)
+logger = get_structured_logger(__name__, middleware="usage")
+
+# Seconds between background compactions of usage event logs into stats
+COMPACT_INTERVAL_S = 5.0
+
+# Number of logged calls that forces a compaction before the interval elapses
+BATCH_THRESHOLD = 20
+
+# Maximum number of queued usage events applied in one pass
+MAX_DRAIN = 100
+
+# Number of most recent errors kept per tool
+MAX_ERRORS = 10
+
+# Queued usage event: (tool_name, execution_time, end_time, success, error, request_id)
+UsageEvent = Tuple[str, float, float, bool, Optional[str], Optional[str]]
+
+# Usage stats keyed by tool name, kept in memory between compactions
+_stats_cache: Dict[str, Dict[str, Any]] = {}
+# Tools with logged events not yet compacted into their stats
+_dirty: Set[str] = set()
+_pending_updates = 0
+_last_compaction = 0.0
+
+
+def _usage_schema(tool_name: str) -> str:
+    """Get the database schema for a tool's usage stats."""
+    return f"middleware/usage/{tool_name}"
+
+
+def _get_stats(tool_name: str) -> Dict[str, Any]:
+    """
+    Get cached usage stats for a tool, loading them from the database on first use.
+
+    Args:
+        tool_name: Name of the tool
+
+    Returns:
+        Mutable stats dictionary for the tool
+    """
+    stats = _stats_cache.get(tool_name)
+    if stats is None:
+        existing_data = load_from_database(_usage_schema(tool_name))
+
+        # Get existing stats or create new
+        stats = existing_data.get("data", {
+            "tool_name": tool_name,
+            "total_calls": 0,
+            "successful_calls": 0,
+            "failed_calls": 0,
+            "total_execution_time": 0.0,
+            "average_execution_time": 0.0,
+            "last_called": None,
+            "errors": []
+        })
+
+        # Bound the error history in place instead of re-slicing on each failure
+        stats["errors"] = deque(stats["errors"], maxlen=MAX_ERRORS)
+        _stats_cache[tool_name] = stats
+
+    return stats
+
+
+def _group_by_tool(batch: List[UsageEvent]) -> Dict[str, List[UsageEvent]]:
+    """Group usage events by tool name, preserving order."""
+    by_tool: Dict[str, List[UsageEvent]] = {}
+    for event in batch:
+        by_tool.setdefault(event[0], []).append(event)
+    return by_tool
+
+
+def _update_stats(stats: Dict[str, Any], event: Dict[str, Any]) -> None:
+    """
+    Apply a single logged tool call to a tool's stats.
+
+    Args:
+        stats: Stats dictionary for the tool
+        event: Logged call with "ts" (end epoch), "dt" (seconds), "ok" and "err"
+    """
+    stats["total_calls"] += 1
+    stats["total_execution_time"] += event["dt"]
+
+    if event["ok"]:
+        stats["successful_calls"] += 1
+    else:
+        stats["failed_calls"] += 1
+        if event["err"]:
+            stats["errors"].append({
+                "timestamp": datetime.fromtimestamp(event["ts"], tz=timezone.utc).isoformat(),
+                "error": event["err"]
+            })
+
+    # Calculate average
+    stats["average_execution_time"] = stats["total_execution_time"] / stats["total_calls"]
+    # Epoch seconds; formatted only by whoever reads the stats
+    stats["last_called"] = event["ts"]
+
+
+def _log_events(tool_name: str, events: List[UsageEvent]) -> None:
+    """
+    Append usage events to a tool's event log and mark it for compaction.
+
+    Args:
+        tool_name: Name of the tool
+        events: Usage events for that tool
+    """
+    append_to_log(_usage_schema(tool_name), [
+        {"ts": end_time, "dt": execution_time, "ok": success, "err": error}
+        for _, execution_time, end_time, success, error, _ in events
+    ])
+    _dirty.add(tool_name)
+
+
+def _compact_tool(tool_name: str) -> bool:
+    """
+    Fold a tool's logged events into its stats and save the summary.
+
+    Args:
+        tool_name: Name of the dirty tool
+
+    Returns:
+        True if saved; on failure the tool stays dirty so the next compaction retries it
+    """
+    try:
+        schema = _usage_schema(tool_name)
+        stats = _get_stats(tool_name)
+
+        for event in read_log(schema):
+            _update_stats(stats, event)
+
+        # The events now live in the cached stats, so clear the log before
+        # saving; a failed save is retried from the cache, not double counted
+        truncate_log(schema)
+
+        save_to_database(schema, {**stats, "errors": list(stats["errors"])})
+        _dirty.discard(tool_name)
+        return True
+    except Exception as e:
+        logger.error(
+            "Failed to compact usage stats for %s: %s",
+            tool_name,
+            e,
+            tool_name=tool_name,
+            error=str(e),
+            exc_info=True
+        )
+        return False
+
+
+def _record_compaction(compacted: int) -> None:
+    """Reset batch counters after a compaction pass."""
+    global _pending_updates, _last_compaction
+
+    _pending_updates = 0
+    _last_compaction = time.time()
+
+    if compacted and logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Usage stats compacted for %d tools",
+            compacted,
+            compacted_tools=compacted
+        )
+
+
+def flush_usage_stats() -> int:
+    """
+    Compact all pending usage events into stats and save them in one pass.
+
+    Used at shutdown, when no event loop is left to contend with.
+
+    Returns:
+        Number of tools whose stats were saved
+    """
+    compacted = sum(_compact_tool(tool_name) for tool_name in list(_dirty))
+    _record_compaction(compacted)
+    return compacted
 
 
 class GitHubUsageTrackingMiddleware(Middleware):
     """Middleware to track API usage and execution time."""
 
+    def __init__(self):
+        self._queue: "asyncio.Queue[UsageEvent]" = asyncio.Queue()
+        # Bound once since it runs on every tool call
+        self._enqueue = self._queue.put_nowait
+        self._worker: Optional[asyncio.Task] = None
+        self._compact_task: Optional[asyncio.Task] = None
+        # Serializes event log appends and compactions per tool
+        self._locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+    def _ensure_background_tasks(self) -> None:
+        """Start the usage worker and compaction loop on the running event loop."""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._consume())
+        if self._compact_task is None or self._compact_task.done():
+            self._compact_task = asyncio.create_task(self._compact_loop())
+
+    def _drain(self, batch: List[UsageEvent]) -> None:
+        """Move queued usage events into batch without waiting."""
+        while len(batch) < MAX_DRAIN:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+
+    async def _consume(self) -> None:
+        """Append queued usage events to the per-tool event logs in batches."""
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                self._drain(batch)
+                await self._track_usage(batch)
+        except asyncio.CancelledError:
+            # Log events queued before shutdown so they are not lost
+            batch: List[UsageEvent] = []
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            for tool_name, events in _group_by_tool(batch).items():
+                _log_events(tool_name, events)
+            flush_usage_stats()
+            raise
+
+    async def _compact_loop(self) -> None:
+        """Periodically compact usage event logs into the stats summaries."""
+        try:
+            while True:
+                await asyncio.sleep(COMPACT_INTERVAL_S)
+                await self._compact()
+        except asyncio.CancelledError:
+            # Persist whatever is left when the server shuts down
+            flush_usage_stats()
+            raise
+
+    async def _compact(self) -> int:
+        """
+        Compact all dirty tools, holding each tool's lock while it is rewritten.
+
+        Returns:
+            Number of tools whose stats were saved
+        """
+        compacted = 0
+        for tool_name in list(_dirty):
+            async with self._locks[tool_name]:
+                compacted += _compact_tool(tool_name)
+        _record_compaction(compacted)
+        return compacted
+
     async def on_call_tool(
         self,
         context: MiddlewareContext[mt.CallToolRequestParams],
@@ -32,150 +283,119 @@ class GitHubUsageTrackingMiddleware(Middleware):
         Returns:
             Tool result from next middleware
         """
-        # Generate request_id for correlation
-        request_id = str(uuid.uuid4())
-
-        tool_name = context.source.name if hasattr(context.source, 'name') else str(context.source)
-        start_time = time.time()
-
-        logger.info(
-            f"Starting tool execution: {tool_name}",
-            extra={
-                "request_id": request_id,
-                "extra_fields": {"tool_name": tool_name}
-            }
-        )
+        log_info = logger.isEnabledFor(logging.INFO)
 
-        # Store request_id in context for downstream use
-        if hasattr(context, 'request_id'):
-            context.request_id = request_id
+        # Generate request_id for correlation and share it with downstream handlers
+        request_id = new_request_id()
+        request_id_token = REQUEST_ID.set(request_id)
+
+        try:
+            tool_name = context.source.name
+        except AttributeError:
+            tool_name = str(context.source)
+        # Monotonic clock for latency; wall clock only for when the call ended
+        start = time.perf_counter()
+
+        self._ensure_background_tasks()
+
+        if log_info:
+            logger.info(
+                "Starting tool execution: %s",
+                tool_name,
+                request_id=request_id,
+                tool_name=tool_name
+            )
 
         try:
             # Call the next middleware/tool
             result = await call_next(context)
 
             # Calculate execution time
-            execution_time = time.time() - start_time
+            execution_time = time.perf_counter() - start
             execution_time_ms = execution_time * 1000
 
-            # Track successful execution
-            self._track_usage(tool_name, execution_time, success=True, request_id=request_id)
+            # Track successful execution off the request path
+            self._enqueue((tool_name, execution_time, time.time(), True, None, request_id))
 
-            logger.info(
-                f"Tool {tool_name} completed in {execution_time:.2f}s",
-                extra={
-                    "request_id": request_id,
-                    "execution_time_ms": execution_time_ms,
-                    "extra_fields": {
-                        "tool_name": tool_name,
-                        "success": True
-                    }
-                }
-            )
+            if log_info:
+                logger.info(
+                    "Tool %s completed in %.2fs",
+                    tool_name,
+                    execution_time,
+                    request_id=request_id,
+                    execution_time_ms=execution_time_ms,
+                    tool_name=tool_name,
+                    success=True
+                )
 
             return result
 
         except Exception as e:
             # Calculate execution time even on error
-            execution_time = time.time() - start_time
+            execution_time = time.perf_counter() - start
             execution_time_ms = execution_time * 1000
 
-            # Track failed execution
-            self._track_usage(tool_name, execution_time, success=False, error=str(e), request_id=request_id)
+            # Track failed execution off the request path
+            self._enqueue((tool_name, execution_time, time.time(), False, str(e), request_id))
 
             logger.error(
-                f"Tool {tool_name} failed after {execution_time:.2f}s: {str(e)}",
-                extra={
-                    "request_id": request_id,
-                    "execution_time_ms": execution_time_ms,
-                    "extra_fields": {
-                        "tool_name": tool_name,
-                        "success": False,
-                        "error": str(e)
-                    }
-                },
+                "Tool %s failed after %.2fs: %s",
+                tool_name,
+                execution_time,
+                e,
+                request_id=request_id,
+                execution_time_ms=execution_time_ms,
+                tool_name=tool_name,
+                success=False,
+                error=str(e),
                 exc_info=True
             )
 
             # Re-raise the exception
             raise
 
-    def _track_usage(
-        self,
-        tool_name: str,
-        execution_time: float,
-        success: bool,
-        error: str = None,
-        request_id: str = None
-    ) -> None:
+        finally:
+            REQUEST_ID.reset(request_id_token)
+
+    async def _track_usage(self, batch: List[UsageEvent]) -> None:
         """
-        Save usage statistics to database.
+        Append a batch of usage events to the event logs, one write per tool.
 
         Args:
-            tool_name: Name of the tool executed
-            execution_time: Time taken to execute in seconds
-            success: Whether execution was successful
-            error: Error message if execution failed
-            request_id: Request ID for correlation
+            batch: Usage events drained from the queue
         """
-        try:
-            # Load existing usage data
-            schema = f"middleware/usage/{tool_name}"
-            existing_data = load_from_database(schema)
-
-            # Get existing stats or create new
-            stats = existing_data.get("data", {
-                "tool_name": tool_name,
-                "total_calls": 0,
-                "successful_calls": 0,
-                "failed_calls": 0,
-                "total_execution_time": 0.0,
-                "average_execution_time": 0.0,
-                "last_called": None,
-                "errors": []
-            })
+        global _pending_updates
 
-            # Update stats
-            stats["total_calls"] += 1
-            stats["total_execution_time"] += execution_time
-
-            if success:
-                stats["successful_calls"] += 1
-            else:
-                stats["failed_calls"] += 1
-                if error:
-                    stats["errors"].append({
-                        "timestamp": datetime.now(timezone.utc).isoformat(),
-                        "error": error
-                    })
-                    # Keep only last 10 errors
-                    stats["errors"] = stats["errors"][-10:]
-
-            # Calculate average
-            stats["average_execution_time"] = stats["total_execution_time"] / stats["total_calls"]
-            stats["last_called"] = datetime.now(timezone.utc).isoformat()
-
-            # Save updated stats
-            save_to_database(schema, stats)
-
-            logger.debug(
-                f"Usage stats saved for {tool_name}",
-                extra={
-                    "request_id": request_id,
-                    "extra_fields": {"tool_name": tool_name}
-                }
-            )
+        log_debug = logger.isEnabledFor(logging.DEBUG)
 
-        except Exception as e:
-            # Don't fail the tool call if tracking fails
-            logger.error(
-                f"Failed to track usage for {tool_name}: {str(e)}",
-                extra={
-                    "request_id": request_id,
-                    "extra_fields": {
-                        "tool_name": tool_name,
-                        "error": str(e)
-                    }
-                },
-                exc_info=True
-            )
+        for tool_name, events in _group_by_tool(batch).items():
+            try:
+                async with self._locks[tool_name]:
+                    _log_events(tool_name, events)
+
+                if log_debug:
+                    logger.debug(
+                        "Usage events logged for %s",
+                        tool_name,
+                        request_id=events[-1][5],
+                        tool_name=tool_name,
+                        events=len(events)
+                    )
+
+            except Exception as e:
+                # Don't let one tool's log break tracking for the rest
+                logger.error(
+                    "Failed to track usage for %s: %s",
+                    tool_name,
+                    e,
+                    request_id=events[-1][5],
+                    tool_name=tool_name,
+                    error=str(e),
+                    exc_info=True
+                )
+
+        _pending_updates += len(batch)
+
+        # Compact early when enough calls have accumulated
+        if _pending_updates >= BATCH_THRESHOLD:
+            await self._compact()
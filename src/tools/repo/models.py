@@ -0,0 +1,85 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class RepositoryInfo:
+    """Result of get_repository_info."""
+
+    success: bool = True
+    owner: str
+    repo: str
+    name: Optional[str]
+    description: Optional[str]
+    stars: int
+    forks: int
+    language: Optional[str]
+    license: Optional[str]
+    created_at: Optional[str]
+    updated_at: Optional[str]
+    is_private: bool
+    default_branch: Optional[str]
+    topics: List[str]
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class DirectoryContents:
+    """Result of get_directory_contents."""
+
+    success: bool = True
+    owner: str
+    repo: str
+    path: str
+    branch: Optional[str]
+    entries: List[Dict[str, Any]]
+    count: int
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class FileContent:
+    """Result of get_file_content."""
+
+    success: bool = True
+    owner: str
+    repo: str
+    path: str
+    branch: Optional[str]
+    content: Optional[str]
+    size: int
+    is_binary: bool
+    message: Optional[str] = None
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class BranchList:
+    """Result of get_branches."""
+
+    success: bool = True
+    owner: str
+    repo: str
+    branches: List[Dict[str, Any]]
+    count: int
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class Readme:
+    """Result of get_readme."""
+
+    success: bool = True
+    owner: str
+    repo: str
+    branch: Optional[str]
+    filename: str
+    content: str
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class CommitList:
+    """Result of get_commits."""
+
+    success: bool = True
+    owner: str
+    repo: str
+    branch: Optional[str]
+    commits: List[Dict[str, Any]]
+    count: int
@@ -1,147 +1,443 @@
-import uuid
-from typing import Any, Dict, Optional, List
+import logging
+import re
+from typing import Any, Awaitable, Callable, Dict, Final, Optional, Tuple
 from fastmcp import FastMCP, Context
 from fastmcp.exceptions import ToolError
 
 from ...utils import github_client
+from ...utils.fastuuid import new_request_id
 from ...utils.logging import get_logger
+from ...utils.request_context import REQUEST_ID
+from .models import BranchList, CommitList, DirectoryContents, FileContent, Readme, RepositoryInfo
 
 
 logger = get_logger(__name__)
 
 
-def register_repo_reader_tools(server: FastMCP) -> None:
-    """Register all repository reader tools."""
-
-    @server.tool(name="get_repository_info", tags={"api", "github", "repo"})
-    async def get_repository_info(
-        ctx: Context,
-        owner: str,
-        repo: str
-    ) -> Dict[str, Any]:
-        """
-        Get basic repository metadata.
-
-        Args:
-            owner: Repository owner (user or organization)
-            repo: Repository name
-
-        Returns:
-            Dictionary containing repository metadata including name, description,
-            stars, forks, language, license, dates, and topics
-        """
-        request_id = str(uuid.uuid4())
-
+# Candidate README filenames, in order of preference
+_README_FILES = ("README.md", "README", "readme.md", "Readme.md", "README.rst", "README.txt")
+
+# (response alias, query variable, filename) for each README candidate
+_README_LOOKUPS = tuple(
+    (f"r{i}", f"expr{i}", readme_name) for i, readme_name in enumerate(_README_FILES)
+)
+
+_REPOSITORY_INFO_QUERY: Final[str] = """
+query GetRepository($owner: String!, $name: String!) {
+  repository(owner: $owner, name: $name) {
+    name
+    description
+    stargazerCount
+    forkCount
+    primaryLanguage { name }
+    licenseInfo { name spdxId }
+    createdAt
+    updatedAt
+    isPrivate
+    defaultBranchRef { name }
+    repositoryTopics(first: 10) {
+      nodes { topic { name } }
+    }
+  }
+}
+"""
+
+_DIRECTORY_CONTENTS_QUERY: Final[str] = """
+query GetDirectoryContents($owner: String!, $name: String!, $expression: String!) {
+  repository(owner: $owner, name: $name) {
+    defaultBranchRef { name }
+    object(expression: $expression) {
+      ... on Tree {
+        entries {
+          name
+          type
+          path
+        }
+      }
+    }
+  }
+}
+"""
+
+_FILE_CONTENT_QUERY: Final[str] = """
+query GetFileContent($owner: String!, $name: String!, $expression: String!) {
+  repository(owner: $owner, name: $name) {
+    defaultBranchRef { name }
+    object(expression: $expression) {
+      ... on Blob {
+        text
+        byteSize
+        isBinary
+      }
+    }
+  }
+}
+"""
+
+# Same lookup without the blob text, for metadata-only reads and binary files
+_FILE_METADATA_QUERY: Final[str] = """
+query GetFileMetadata($owner: String!, $name: String!, $expression: String!) {
+  repository(owner: $owner, name: $name) {
+    defaultBranchRef { name }
+    object(expression: $expression) {
+      ... on Blob {
+        byteSize
+        isBinary
+      }
+    }
+  }
+}
+"""
+
+_BRANCHES_QUERY: Final[str] = """
+query GetBranches($owner: String!, $name: String!, $limit: Int!) {
+  repository(owner: $owner, name: $name) {
+    refs(refPrefix: "refs/heads/", first: $limit) {
+      nodes {
+        name
+        target {
+          ... on Commit {
+            oid
+            committedDate
+            messageHeadline
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+# Looks up every README candidate in one request, one aliased object per filename
+_README_QUERY: Final[str] = """
+query GetReadme($owner: String!, $name: String!%s) {
+  repository(owner: $owner, name: $name) {
+    defaultBranchRef { name }
+%s
+  }
+}
+""" % (
+    "".join(f", ${variable}: String!" for _, variable, _ in _README_LOOKUPS),
+    "\n".join(
+        f"    {alias}: object(expression: ${variable}) {{ ... on Blob {{ text }} }}"
+        for alias, variable, _ in _README_LOOKUPS
+    ),
+)
+
+_COMMITS_QUERY: Final[str] = """
+query GetCommits($owner: String!, $name: String!, $revision: String!, $limit: Int!) {
+  repository(owner: $owner, name: $name) {
+    defaultBranchRef { name }
+    object(expression: $revision) {
+      ... on Commit {
+        history(first: $limit) {
+          nodes {
+            oid
+            messageHeadline
+            message
+            author {
+              name
+              email
+              date
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+# Owner and repository names GitHub accepts, and file paths safe to embed in an expression
+_OWNER_RE = re.compile(r"\A[A-Za-z0-9][A-Za-z0-9-]{0,38}\Z")
+_REPO_RE = re.compile(r"\A[A-Za-z0-9._-]{1,100}\Z")
+_PATH_RE = re.compile(r"\A[^\x00\n\r]{0,1024}\Z")
+
+# Tree entry types reported as something other than "file"
+_ENTRY_TYPES = {"tree": "directory"}
+
+# Extensions whose text GitHub would not return anyway, so it is never requested;
+# a tuple so one str.endswith call checks them all
+_BINARY_EXTENSIONS = (
+    ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".ico", ".webp",
+    ".zip", ".tar", ".gz", ".tgz", ".bz2", ".xz", ".7z", ".rar", ".jar",
+    ".pdf", ".woff", ".woff2", ".ttf", ".otf", ".eot",
+    ".exe", ".dll", ".so", ".dylib", ".bin", ".class", ".pyc", ".wasm",
+    ".mp3", ".mp4", ".wav", ".ogg", ".mov", ".avi",
+)
+
+
+def _current_request_id() -> str:
+    """Get the request ID set by the usage middleware, generating one only if absent."""
+    return REQUEST_ID.get(None) or new_request_id()
+
+
+async def _notify_error(ctx: Context, message: str) -> None:
+    """
+    Send an error message to the client without masking the error being raised.
+
+    Args:
+        ctx: FastMCP context of the tool call
+        message: Error message for the client
+    """
+    try:
+        await ctx.error(message)
+    except Exception:
+        logger.debug("Failed to send error notification to client", exc_info=True)
+
+
+def _validate(owner: str, repo: str, path: Optional[str] = None) -> None:
+    """
+    Reject malformed names and paths before spending a request on them.
+
+    Args:
+        owner: Repository owner (user or organization)
+        repo: Repository name
+        path: File or directory path, if the tool takes one
+
+    Raises:
+        ToolError: If any argument is malformed
+    """
+    if not _OWNER_RE.match(owner):
+        raise ToolError(f"Invalid repository owner: {owner!r}")
+    if not _REPO_RE.match(repo) or repo in (".", ".."):
+        raise ToolError(f"Invalid repository name: {repo!r}")
+    if path is not None and not _PATH_RE.match(path):
+        raise ToolError(f"Invalid path: {path!r}")
+
+
+def _looks_binary(path: str) -> bool:
+    """
+    Guess from the file extension whether a path is binary.
+
+    Args:
+        path: File path
+
+    Returns:
+        True if the extension is a known binary format
+    """
+    return path.lower().endswith(_BINARY_EXTENSIONS)
+
+
+def _revision(branch: Optional[str]) -> str:
+    """
+    Get the revision to resolve paths against.
+
+    Args:
+        branch: Requested branch, or None for the default branch
+
+    Returns:
+        The branch name, or "HEAD" which GitHub resolves to the default branch
+    """
+    return branch or "HEAD"
+
+
+def _branch_name(repository: Dict[str, Any], branch: Optional[str], owner: str, repo: str) -> str:
+    """
+    Get the branch a query was resolved against.
+
+    Args:
+        repository: Repository object from a query that selects defaultBranchRef
+        branch: Requested branch, or None for the default branch
+        owner: Repository owner (user or organization)
+        repo: Repository name
+
+    Returns:
+        The requested branch, or the repository's default branch name
+
+    Raises:
+        ToolError: If no branch was requested and the repository has no
+            default branch, as happens before its first push
+    """
+    if branch:
+        return branch
+    default_branch_ref = repository.get("defaultBranchRef")
+    if not default_branch_ref:
+        raise ToolError(f"Repository {owner}/{repo} is empty and has no default branch")
+    return default_branch_ref["name"]
+
+
+# Shapes a repository object into (response, completion log fields, client message)
+_Formatter = Callable[[Dict[str, Any], str], Awaitable[Tuple[Any, Dict[str, Any], str]]]
+
+
+async def _run_graphql_tool(
+    ctx: Context,
+    tool_name: str,
+    query: str,
+    variables: Dict[str, Any],
+    formatter: _Formatter,
+    *,
+    owner: str,
+    repo: str,
+    start_message: str,
+    failure: str,
+    extra_log: Optional[Dict[str, Any]] = None
+) -> Any:
+    """
+    Run a repository query with the logging and error handling shared by all tools.
+
+    Args:
+        ctx: FastMCP context of the tool call
+        tool_name: Name of the tool, used in logs
+        query: GraphQL query selecting a repository
+        variables: Query variables dictionary
+        formatter: Coroutine shaping the repository object into
+            (response, completion log fields, client message)
+        owner: Repository owner (user or organization)
+        repo: Repository name
+        start_message: Progress message sent to the client before the query
+        failure: Error message prefix for malformed responses
+        extra_log: Tool parameters added to the start log
+
+    Returns:
+        The response built by the formatter
+
+    Raises:
+        ToolError: If the repository is missing, the query fails, or the
+            response is malformed
+    """
+    request_id = _current_request_id()
+    log_info = logger.isEnabledFor(logging.INFO)
+
+    if log_info:
         logger.info(
-            "Starting get_repository_info tool",
+            "Starting %s tool",
+            tool_name,
             extra={
                 "request_id": request_id,
                 "extra_fields": {
-                    "tool": "get_repository_info",
+                    "tool": tool_name,
                     "owner": owner,
-                    "repo": repo
+                    "repo": repo,
+                    **(extra_log or {})
                 }
             }
         )
 
-        await ctx.info(f"Fetching repository info for {owner}/{repo}")
-
-        query = """
-        query GetRepository($owner: String!, $name: String!) {
-          repository(owner: $owner, name: $name) {
-            name
-            description
-            stargazerCount
-            forkCount
-            primaryLanguage { name }
-            licenseInfo { name spdxId }
-            createdAt
-            updatedAt
-            isPrivate
-            defaultBranchRef { name }
-            repositoryTopics(first: 10) {
-              nodes { topic { name } }
-            }
-          }
-        }
-        """
+    await ctx.info(start_message)
 
-        variables = {"owner": owner, "name": repo}
+    try:
+        result = await github_client.execute_query(
+            query=query,
+            variables=variables,
+            request_id=request_id
+        )
 
-        try:
-            result = await github_client.execute_query(
-                query=query,
-                variables=variables,
-                request_id=request_id
-            )
+        repository = result.get("repository")
+        if not repository:
+            raise ToolError(f"Repository {owner}/{repo} not found")
 
-            repository = result.get("repository")
-            if not repository:
-                raise ToolError(f"Repository {owner}/{repo} not found")
-
-            # Extract and format response
-            response = {
-                "success": True,
-                "owner": owner,
-                "repo": repo,
-                "name": repository.get("name"),
-                "description": repository.get("description"),
-                "stars": repository.get("stargazerCount", 0),
-                "forks": repository.get("forkCount", 0),
-                "language": repository.get("primaryLanguage", {}).get("name") if repository.get("primaryLanguage") else None,
-                "license": repository.get("licenseInfo", {}).get("spdxId") if repository.get("licenseInfo") else None,
-                "created_at": repository.get("createdAt"),
-                "updated_at": repository.get("updatedAt"),
-                "is_private": repository.get("isPrivate", False),
-                "default_branch": repository.get("defaultBranchRef", {}).get("name") if repository.get("defaultBranchRef") else None,
-                "topics": [node["topic"]["name"] for node in repository.get("repositoryTopics", {}).get("nodes", [])]
-            }
+        response, summary, message = await formatter(repository, request_id)
 
+        if log_info:
             logger.info(
-                "get_repository_info tool completed successfully",
+                "%s tool completed successfully",
+                tool_name,
                 extra={
                     "request_id": request_id,
-                    "extra_fields": {
-                        "tool": "get_repository_info",
-                        "stars": response["stars"],
-                        "forks": response["forks"]
-                    }
+                    "extra_fields": {"tool": tool_name, **summary}
                 }
             )
 
-            await ctx.info(f"Repository info retrieved: {response['stars']} stars, {response['forks']} forks")
+        await ctx.info(message)
 
-            return response
+        return response
 
-        except github_client.GitHubAPIError as e:
-            logger.error(
-                f"get_repository_info tool failed with GitHub API error: {str(e)}",
-                extra={
-                    "request_id": request_id,
-                    "extra_fields": {
-                        "tool": "get_repository_info",
-                        "error_type": "GitHubAPIError"
-                    }
-                },
-                exc_info=True
-            )
-            await ctx.error(f"GitHub API error: {str(e)}")
-            raise ToolError(str(e))
+    except ToolError as e:
+        # Expected failures such as a missing repository or path
+        await _notify_error(ctx, str(e))
+        raise
 
-        except Exception as e:
-            logger.error(
-                f"get_repository_info tool failed with unexpected error: {str(e)}",
-                extra={
-                    "request_id": request_id,
-                    "extra_fields": {
-                        "tool": "get_repository_info",
-                        "error_type": "UnexpectedError"
-                    }
-                },
-                exc_info=True
+    except github_client.GitHubAPIError as e:
+        logger.exception(
+            "%s tool failed with GitHub API error",
+            tool_name,
+            extra={
+                "request_id": request_id,
+                "extra_fields": {
+                    "tool": tool_name,
+                    "error_type": "GitHubAPIError",
+                    "status_code": e.status
+                }
+            }
+        )
+        await _notify_error(ctx, f"GitHub API error: {e}")
+        raise ToolError(str(e))
+
+    except (KeyError, TypeError, AttributeError) as e:
+        logger.exception(
+            "%s tool failed on a malformed response",
+            tool_name,
+            extra={
+                "request_id": request_id,
+                "extra_fields": {
+                    "tool": tool_name,
+                    "error_type": "MalformedResponse"
+                }
+            }
+        )
+        await _notify_error(ctx, f"Unexpected response from GitHub: {e}")
+        raise ToolError(f"{failure}: {e}")
+
+
+def register_repo_reader_tools(server: FastMCP) -> None:
+    """Register all repository reader tools."""
+
+    @server.tool(name="get_repository_info", tags={"api", "github", "repo"})
+    async def get_repository_info(
+        ctx: Context,
+        owner: str,
+        repo: str
+    ) -> RepositoryInfo:
+        """
+        Get basic repository metadata.
+
+        Args:
+            owner: Repository owner (user or organization)
+            repo: Repository name
+
+        Returns:
+            Repository metadata including name, description,
+            stars, forks, language, license, dates, and topics
+        """
+        _validate(owner, repo)
+
+        async def _format(repository, request_id):
+            # Bind nested objects once; GraphQL returns null for missing ones
+            primary_language = repository.get("primaryLanguage")
+            license_info = repository.get("licenseInfo")
+            default_branch_ref = repository.get("defaultBranchRef")
+            topic_nodes = (repository.get("repositoryTopics") or {}).get("nodes") or ()
+
+            response = RepositoryInfo(
+                owner=owner,
+                repo=repo,
+                name=repository.get("name"),
+                description=repository.get("description"),
+                stars=repository.get("stargazerCount", 0),
+                forks=repository.get("forkCount", 0),
+                language=primary_language["name"] if primary_language else None,
+                license=license_info["spdxId"] if license_info else None,
+                created_at=repository.get("createdAt"),
+                updated_at=repository.get("updatedAt"),
+                is_private=repository.get("isPrivate", False),
+                default_branch=default_branch_ref["name"] if default_branch_ref else None,
+                topics=[node["topic"]["name"] for node in topic_nodes]
+            )
+            return (
+                response,
+                {"stars": response.stars, "forks": response.forks},
+                f"Repository info retrieved: {response.stars} stars, {response.forks} forks"
             )
-            await ctx.error(f"Unexpected error: {str(e)}")
-            raise ToolError(f"Failed to get repository info: {str(e)}")
+
+        return await _run_graphql_tool(
+            ctx, "get_repository_info", _REPOSITORY_INFO_QUERY,
+            {"owner": owner, "name": repo}, _format,
+            owner=owner, repo=repo,
+            start_message=f"Fetching repository info for {owner}/{repo}",
+            failure="Failed to get repository info"
+        )
 
     @server.tool(name="get_directory_contents", tags={"api", "github", "repo"})
     async def get_directory_contents(
@@ -150,7 +446,7 @@ def register_repo_reader_tools(server: FastMCP) -> None:
         repo: str,
         path: str = "",
         branch: Optional[str] = None
-    ) -> Dict[str, Any]:
+    ) -> DirectoryContents:
         """
         List files and directories at a given path in a repository.
 
@@ -161,146 +457,46 @@ def register_repo_reader_tools(server: FastMCP) -> None:
             branch: Branch name (optional, defaults to default branch)
 
         Returns:
-            Dictionary containing list of entries with name, type, and path
+            List of entries with name, type, and path
         """
-        request_id = str(uuid.uuid4())
-
-        logger.info(
-            "Starting get_directory_contents tool",
-            extra={
-                "request_id": request_id,
-                "extra_fields": {
-                    "tool": "get_directory_contents",
-                    "owner": owner,
-                    "repo": repo,
-                    "path": path,
-                    "branch": branch
-                }
-            }
-        )
+        _validate(owner, repo, path)
 
-        await ctx.info(f"Listing contents of {owner}/{repo}/{path or '(root)'}")
-
-        # First, get default branch if not specified
-        if not branch:
-            branch_query = """
-            query GetDefaultBranch($owner: String!, $name: String!) {
-              repository(owner: $owner, name: $name) {
-                defaultBranchRef { name }
-              }
-            }
-            """
-            branch_result = await github_client.execute_query(
-                query=branch_query,
-                variables={"owner": owner, "name": repo},
-                request_id=request_id
-            )
-            repository = branch_result.get("repository")
-            if not repository:
-                raise ToolError(f"Repository {owner}/{repo} not found")
-            branch = repository.get("defaultBranchRef", {}).get("name", "main")
-
-        # Build expression for the path
-        expression = f"{branch}:{path}" if path else f"{branch}:"
-
-        query = """
-        query GetDirectoryContents($owner: String!, $name: String!, $expression: String!) {
-          repository(owner: $owner, name: $name) {
-            object(expression: $expression) {
-              ... on Tree {
-                entries {
-                  name
-                  type
-                  path
-                }
-              }
-            }
-          }
-        }
-        """
-
-        variables = {"owner": owner, "name": repo, "expression": expression}
-
-        try:
-            result = await github_client.execute_query(
-                query=query,
-                variables=variables,
-                request_id=request_id
-            )
-
-            repository = result.get("repository")
-            if not repository:
-                raise ToolError(f"Repository {owner}/{repo} not found")
+        async def _format(repository, request_id):
+            resolved_branch = _branch_name(repository, branch, owner, repo)
 
             obj = repository.get("object")
             if not obj:
-                raise ToolError(f"Path '{path}' not found in {owner}/{repo} on branch {branch}")
-
-            entries = obj.get("entries", [])
-
-            # Format entries
-            formatted_entries = []
-            for entry in entries:
-                formatted_entries.append({
-                    "name": entry.get("name"),
-                    "type": "directory" if entry.get("type") == "tree" else "file",
-                    "path": entry.get("path")
-                })
-
-            response = {
-                "success": True,
-                "owner": owner,
-                "repo": repo,
-                "path": path or "/",
-                "branch": branch,
-                "entries": formatted_entries,
-                "count": len(formatted_entries)
-            }
+                raise ToolError(f"Path '{path}' not found in {owner}/{repo} on branch {resolved_branch}")
 
-            logger.info(
-                "get_directory_contents tool completed successfully",
-                extra={
-                    "request_id": request_id,
-                    "extra_fields": {
-                        "tool": "get_directory_contents",
-                        "entries_count": len(formatted_entries)
-                    }
+            entries = [
+                {
+                    "name": entry["name"],
+                    "type": _ENTRY_TYPES.get(entry["type"], "file"),
+                    "path": entry["path"]
                 }
+                for entry in obj.get("entries", [])
+            ]
+
+            response = DirectoryContents(
+                owner=owner,
+                repo=repo,
+                path=path or "/",
+                branch=resolved_branch,
+                entries=entries,
+                count=len(entries)
             )
+            return response, {"entries_count": len(entries)}, f"Found {len(entries)} entries"
 
-            await ctx.info(f"Found {len(formatted_entries)} entries")
-
-            return response
+        # The default branch name comes back with the tree
+        variables = {"owner": owner, "name": repo, "expression": f"{_revision(branch)}:{path}"}
 
-        except github_client.GitHubAPIError as e:
-            logger.error(
-                f"get_directory_contents tool failed with GitHub API error: {str(e)}",
-                extra={
-                    "request_id": request_id,
-                    "extra_fields": {
-                        "tool": "get_directory_contents",
-                        "error_type": "GitHubAPIError"
-                    }
-                },
-                exc_info=True
-            )
-            await ctx.error(f"GitHub API error: {str(e)}")
-            raise ToolError(str(e))
-
-        except Exception as e:
-            logger.error(
-                f"get_directory_contents tool failed with unexpected error: {str(e)}",
-                extra={
-                    "request_id": request_id,
-                    "extra_fields": {
-                        "tool": "get_directory_contents",
-                        "error_type": "UnexpectedError"
-                    }
-                },
-                exc_info=True
-            )
-            await ctx.error(f"Unexpected error: {str(e)}")
-            raise ToolError(f"Failed to get directory contents: {str(e)}")
+        return await _run_graphql_tool(
+            ctx, "get_directory_contents", _DIRECTORY_CONTENTS_QUERY, variables, _format,
+            owner=owner, repo=repo,
+            start_message=f"Listing contents of {owner}/{repo}/{path or '(root)'}",
+            failure="Failed to get directory contents",
+            extra_log={"path": path, "branch": branch}
+        )
 
     @server.tool(name="get_file_content", tags={"api", "github", "repo"})
     async def get_file_content(
@@ -308,8 +504,9 @@ def register_repo_reader_tools(server: FastMCP) -> None:
         owner: str,
         repo: str,
         path: str,
-        branch: Optional[str] = None
-    ) -> Dict[str, Any]:
+        branch: Optional[str] = None,
+        metadata_only: bool = False
+    ) -> FileContent:
         """
         Read the content of a specific file in a repository.
 
@@ -318,142 +515,73 @@ def register_repo_reader_tools(server: FastMCP) -> None:
             repo: Repository name
             path: File path
             branch: Branch name (optional, defaults to default branch)
+            metadata_only: Return only size and binary flag, without content (default: False)
 
         Returns:
-            Dictionary containing file content, size, and encoding info
+            File content, size, and encoding info
         """
-        request_id = str(uuid.uuid4())
+        _validate(owner, repo, path)
 
-        logger.info(
-            "Starting get_file_content tool",
-            extra={
-                "request_id": request_id,
-                "extra_fields": {
-                    "tool": "get_file_content",
-                    "owner": owner,
-                    "repo": repo,
-                    "path": path,
-                    "branch": branch
-                }
-            }
-        )
+        variables = {"owner": owner, "name": repo, "expression": f"{_revision(branch)}:{path}"}
 
-        await ctx.info(f"Reading file {owner}/{repo}/{path}")
+        # Skip downloading text the caller doesn't want or that is almost certainly binary
+        fetch_text = not metadata_only and not _looks_binary(path)
 
-        # First, get default branch if not specified
-        if not branch:
-            branch_query = """
-            query GetDefaultBranch($owner: String!, $name: String!) {
-              repository(owner: $owner, name: $name) {
-                defaultBranchRef { name }
-              }
-            }
-            """
-            branch_result = await github_client.execute_query(
-                query=branch_query,
-                variables={"owner": owner, "name": repo},
-                request_id=request_id
-            )
-            repository = branch_result.get("repository")
-            if not repository:
-                raise ToolError(f"Repository {owner}/{repo} not found")
-            branch = repository.get("defaultBranchRef", {}).get("name", "main")
-
-        expression = f"{branch}:{path}"
-
-        query = """
-        query GetFileContent($owner: String!, $name: String!, $expression: String!) {
-          repository(owner: $owner, name: $name) {
-            object(expression: $expression) {
-              ... on Blob {
-                text
-                byteSize
-                isBinary
-              }
-            }
-          }
-        }
-        """
-
-        variables = {"owner": owner, "name": repo, "expression": expression}
-
-        try:
-            result = await github_client.execute_query(
-                query=query,
-                variables=variables,
-                request_id=request_id
-            )
-
-            repository = result.get("repository")
-            if not repository:
-                raise ToolError(f"Repository {owner}/{repo} not found")
+        async def _format(repository, request_id):
+            resolved_branch = _branch_name(repository, branch, owner, repo)
 
             obj = repository.get("object")
             if not obj:
-                raise ToolError(f"File '{path}' not found in {owner}/{repo} on branch {branch}")
+                raise ToolError(f"File '{path}' not found in {owner}/{repo} on branch {resolved_branch}")
 
             is_binary = obj.get("isBinary", False)
-            content = obj.get("text") if not is_binary else None
-
-            response = {
-                "success": True,
-                "owner": owner,
-                "repo": repo,
-                "path": path,
-                "branch": branch,
-                "content": content,
-                "size": obj.get("byteSize", 0),
-                "is_binary": is_binary
-            }
-
-            if is_binary:
-                response["message"] = "File is binary and cannot be displayed as text"
-
-            logger.info(
-                "get_file_content tool completed successfully",
-                extra={
-                    "request_id": request_id,
-                    "extra_fields": {
-                        "tool": "get_file_content",
-                        "file_size": obj.get("byteSize", 0),
-                        "is_binary": is_binary
-                    }
-                }
-            )
+            has_text = fetch_text
 
-            await ctx.info(f"File read: {obj.get('byteSize', 0)} bytes")
+            if not has_text and not metadata_only and not is_binary:
+                # The extension guess was wrong; fetch the text after all
+                result = await github_client.execute_query(
+                    query=_FILE_CONTENT_QUERY,
+                    variables=variables,
+                    request_id=request_id
+                )
+                obj = (result.get("repository") or {}).get("object") or obj
+                has_text = True
 
-            return response
+            content = obj.get("text") if has_text and not is_binary else None
+            byte_size = obj.get("byteSize", 0)
 
-        except github_client.GitHubAPIError as e:
-            logger.error(
-                f"get_file_content tool failed with GitHub API error: {str(e)}",
-                extra={
-                    "request_id": request_id,
-                    "extra_fields": {
-                        "tool": "get_file_content",
-                        "error_type": "GitHubAPIError"
-                    }
-                },
-                exc_info=True
+            if is_binary:
+                message = "File is binary and cannot be displayed as text"
+            elif metadata_only:
+                message = "Content omitted (metadata_only)"
+            else:
+                message = None
+
+            response = FileContent(
+                owner=owner,
+                repo=repo,
+                path=path,
+                branch=resolved_branch,
+                content=content,
+                size=byte_size,
+                is_binary=is_binary,
+                message=message
             )
-            await ctx.error(f"GitHub API error: {str(e)}")
-            raise ToolError(str(e))
-
-        except Exception as e:
-            logger.error(
-                f"get_file_content tool failed with unexpected error: {str(e)}",
-                extra={
-                    "request_id": request_id,
-                    "extra_fields": {
-                        "tool": "get_file_content",
-                        "error_type": "UnexpectedError"
-                    }
-                },
-                exc_info=True
+            return (
+                response,
+                {"file_size": byte_size, "is_binary": is_binary},
+                f"File read: {byte_size} bytes"
             )
-            await ctx.error(f"Unexpected error: {str(e)}")
-            raise ToolError(f"Failed to get file content: {str(e)}")
+
+        return await _run_graphql_tool(
+            ctx, "get_file_content",
+            _FILE_CONTENT_QUERY if fetch_text else _FILE_METADATA_QUERY,
+            variables, _format,
+            owner=owner, repo=repo,
+            start_message=f"Reading file {owner}/{repo}/{path}",
+            failure="Failed to get file content",
+            extra_log={"path": path, "branch": branch}
+        )
 
     @server.tool(name="get_branches", tags={"api", "github", "repo"})
     async def get_branches(
@@ -461,7 +589,7 @@ def register_repo_reader_tools(server: FastMCP) -> None:
         owner: str,
         repo: str,
         limit: int = 20
-    ) -> Dict[str, Any]:
+    ) -> BranchList:
         """
         List repository branches.
 
@@ -471,127 +599,45 @@ def register_repo_reader_tools(server: FastMCP) -> None:
             limit: Number of branches to return (default: 20, max: 100)
 
         Returns:
-            Dictionary containing list of branches with name and last commit info
+            List of branches with name and last commit info
         """
-        request_id = str(uuid.uuid4())
+        _validate(owner, repo)
 
         # Enforce limit
         limit = min(limit, 100)
 
-        logger.info(
-            "Starting get_branches tool",
-            extra={
-                "request_id": request_id,
-                "extra_fields": {
-                    "tool": "get_branches",
-                    "owner": owner,
-                    "repo": repo,
-                    "limit": limit
-                }
-            }
-        )
-
-        await ctx.info(f"Listing branches for {owner}/{repo}")
-
-        query = """
-        query GetBranches($owner: String!, $name: String!, $limit: Int!) {
-          repository(owner: $owner, name: $name) {
-            refs(refPrefix: "refs/heads/", first: $limit) {
-              nodes {
-                name
-                target {
-                  ... on Commit {
-                    oid
-                    committedDate
-                    messageHeadline
-                  }
-                }
-              }
-            }
-          }
-        }
-        """
-
-        variables = {"owner": owner, "name": repo, "limit": limit}
-
-        try:
-            result = await github_client.execute_query(
-                query=query,
-                variables=variables,
-                request_id=request_id
-            )
-
-            repository = result.get("repository")
-            if not repository:
-                raise ToolError(f"Repository {owner}/{repo} not found")
-
+        async def _format(repository, request_id):
             refs = repository.get("refs", {}).get("nodes", [])
 
-            # Format branches
-            branches = []
-            for ref in refs:
-                target = ref.get("target", {})
-                branches.append({
-                    "name": ref.get("name"),
+            # Target is only populated for commits
+            branches = [
+                {
+                    "name": ref["name"],
                     "last_commit": {
-                        "sha": target.get("oid"),
+                        "sha": (target := ref.get("target") or {}).get("oid"),
                         "date": target.get("committedDate"),
                         "message": target.get("messageHeadline")
                     }
-                })
-
-            response = {
-                "success": True,
-                "owner": owner,
-                "repo": repo,
-                "branches": branches,
-                "count": len(branches)
-            }
-
-            logger.info(
-                "get_branches tool completed successfully",
-                extra={
-                    "request_id": request_id,
-                    "extra_fields": {
-                        "tool": "get_branches",
-                        "branches_count": len(branches)
-                    }
                 }
+                for ref in refs
+            ]
+
+            response = BranchList(
+                owner=owner,
+                repo=repo,
+                branches=branches,
+                count=len(branches)
             )
-
-            await ctx.info(f"Found {len(branches)} branches")
-
-            return response
-
-        except github_client.GitHubAPIError as e:
-            logger.error(
-                f"get_branches tool failed with GitHub API error: {str(e)}",
-                extra={
-                    "request_id": request_id,
-                    "extra_fields": {
-                        "tool": "get_branches",
-                        "error_type": "GitHubAPIError"
-                    }
-                },
-                exc_info=True
-            )
-            await ctx.error(f"GitHub API error: {str(e)}")
-            raise ToolError(str(e))
-
-        except Exception as e:
-            logger.error(
-                f"get_branches tool failed with unexpected error: {str(e)}",
-                extra={
-                    "request_id": request_id,
-                    "extra_fields": {
-                        "tool": "get_branches",
-                        "error_type": "UnexpectedError"
-                    }
-                },
-                exc_info=True
-            )
-            await ctx.error(f"Unexpected error: {str(e)}")
-            raise ToolError(f"Failed to get branches: {str(e)}")
+            return response, {"branches_count": len(branches)}, f"Found {len(branches)} branches"
+
+        return await _run_graphql_tool(
+            ctx, "get_branches", _BRANCHES_QUERY,
+            {"owner": owner, "name": repo, "limit": limit}, _format,
+            owner=owner, repo=repo,
+            start_message=f"Listing branches for {owner}/{repo}",
+            failure="Failed to get branches",
+            extra_log={"limit": limit}
+        )
 
     @server.tool(name="get_readme", tags={"api", "github", "repo"})
     async def get_readme(
@@ -599,7 +645,7 @@ def register_repo_reader_tools(server: FastMCP) -> None:
         owner: str,
         repo: str,
         branch: Optional[str] = None
-    ) -> Dict[str, Any]:
+    ) -> Readme:
         """
         Get repository README content.
 
@@ -609,135 +655,45 @@ def register_repo_reader_tools(server: FastMCP) -> None:
             branch: Branch name (optional, defaults to default branch)
 
         Returns:
-            Dictionary containing README content as text
+            README content as text
         """
-        request_id = str(uuid.uuid4())
+        _validate(owner, repo)
 
-        logger.info(
-            "Starting get_readme tool",
-            extra={
-                "request_id": request_id,
-                "extra_fields": {
-                    "tool": "get_readme",
-                    "owner": owner,
-                    "repo": repo,
-                    "branch": branch
-                }
-            }
-        )
-
-        await ctx.info(f"Fetching README for {owner}/{repo}")
+        async def _format(repository, request_id):
+            resolved_branch = _branch_name(repository, branch, owner, repo)
 
-        # First, get default branch if not specified
-        if not branch:
-            branch_query = """
-            query GetDefaultBranch($owner: String!, $name: String!) {
-              repository(owner: $owner, name: $name) {
-                defaultBranchRef { name }
-              }
-            }
-            """
-            branch_result = await github_client.execute_query(
-                query=branch_query,
-                variables={"owner": owner, "name": repo},
-                request_id=request_id
-            )
-            repository = branch_result.get("repository")
-            if not repository:
-                raise ToolError(f"Repository {owner}/{repo} not found")
-            branch = repository.get("defaultBranchRef", {}).get("name", "main")
-
-        # Try different README filenames
-        readme_files = ["README.md", "README", "readme.md", "Readme.md", "README.rst", "README.txt"]
-
-        query = """
-        query GetReadme($owner: String!, $name: String!, $expression: String!) {
-          repository(owner: $owner, name: $name) {
-            object(expression: $expression) {
-              ... on Blob {
-                text
-              }
-            }
-          }
-        }
-        """
-
-        try:
-            for readme_name in readme_files:
-                expression = f"{branch}:{readme_name}"
-                variables = {"owner": owner, "name": repo, "expression": expression}
-
-                result = await github_client.execute_query(
-                    query=query,
-                    variables=variables,
-                    request_id=request_id
-                )
-
-                repository = result.get("repository")
-                if not repository:
-                    raise ToolError(f"Repository {owner}/{repo} not found")
-
-                obj = repository.get("object")
+            for alias, _, readme_name in _README_LOOKUPS:
+                obj = repository.get(alias)
                 if obj and obj.get("text"):
                     content = obj.get("text")
 
-                    response = {
-                        "success": True,
-                        "owner": owner,
-                        "repo": repo,
-                        "branch": branch,
-                        "filename": readme_name,
-                        "content": content
-                    }
-
-                    logger.info(
-                        "get_readme tool completed successfully",
-                        extra={
-                            "request_id": request_id,
-                            "extra_fields": {
-                                "tool": "get_readme",
-                                "filename": readme_name,
-                                "content_length": len(content)
-                            }
-                        }
+                    response = Readme(
+                        owner=owner,
+                        repo=repo,
+                        branch=resolved_branch,
+                        filename=readme_name,
+                        content=content
+                    )
+                    return (
+                        response,
+                        {"filename": readme_name, "content_length": len(content)},
+                        f"Found README: {readme_name}"
                     )
 
-                    await ctx.info(f"Found README: {readme_name}")
-
-                    return response
-
-            # No README found
-            raise ToolError(f"No README file found in {owner}/{repo} on branch {branch}")
+            raise ToolError(f"No README file found in {owner}/{repo} on branch {resolved_branch}")
 
-        except github_client.GitHubAPIError as e:
-            logger.error(
-                f"get_readme tool failed with GitHub API error: {str(e)}",
-                extra={
-                    "request_id": request_id,
-                    "extra_fields": {
-                        "tool": "get_readme",
-                        "error_type": "GitHubAPIError"
-                    }
-                },
-                exc_info=True
-            )
-            await ctx.error(f"GitHub API error: {str(e)}")
-            raise ToolError(str(e))
-
-        except Exception as e:
-            logger.error(
-                f"get_readme tool failed with unexpected error: {str(e)}",
-                extra={
-                    "request_id": request_id,
-                    "extra_fields": {
-                        "tool": "get_readme",
-                        "error_type": "UnexpectedError"
-                    }
-                },
-                exc_info=True
-            )
-            await ctx.error(f"Unexpected error: {str(e)}")
-            raise ToolError(f"Failed to get README: {str(e)}")
+        revision = _revision(branch)
+        variables = {"owner": owner, "name": repo}
+        for _, variable, readme_name in _README_LOOKUPS:
+            variables[variable] = f"{revision}:{readme_name}"
+
+        return await _run_graphql_tool(
+            ctx, "get_readme", _README_QUERY, variables, _format,
+            owner=owner, repo=repo,
+            start_message=f"Fetching README for {owner}/{repo}",
+            failure="Failed to get README",
+            extra_log={"branch": branch}
+        )
 
     @server.tool(name="get_commits", tags={"api", "github", "repo"})
     async def get_commits(
@@ -746,7 +702,7 @@ def register_repo_reader_tools(server: FastMCP) -> None:
         repo: str,
         branch: Optional[str] = None,
         limit: int = 10
-    ) -> Dict[str, Any]:
+    ) -> CommitList:
         """
         Get recent commits on a branch.
 
@@ -757,157 +713,54 @@ def register_repo_reader_tools(server: FastMCP) -> None:
             limit: Number of commits to return (default: 10, max: 50)
 
         Returns:
-            Dictionary containing list of commits with sha, message, author, date
+            List of commits with sha, message, author, date
         """
-        request_id = str(uuid.uuid4())
+        _validate(owner, repo)
 
         # Enforce limit
         limit = min(limit, 50)
 
-        logger.info(
-            "Starting get_commits tool",
-            extra={
-                "request_id": request_id,
-                "extra_fields": {
-                    "tool": "get_commits",
-                    "owner": owner,
-                    "repo": repo,
-                    "branch": branch,
-                    "limit": limit
-                }
-            }
-        )
-
-        await ctx.info(f"Fetching commits for {owner}/{repo}")
-
-        # First, get default branch if not specified
-        if not branch:
-            branch_query = """
-            query GetDefaultBranch($owner: String!, $name: String!) {
-              repository(owner: $owner, name: $name) {
-                defaultBranchRef { name }
-              }
-            }
-            """
-            branch_result = await github_client.execute_query(
-                query=branch_query,
-                variables={"owner": owner, "name": repo},
-                request_id=request_id
-            )
-            repository = branch_result.get("repository")
-            if not repository:
-                raise ToolError(f"Repository {owner}/{repo} not found")
-            branch = repository.get("defaultBranchRef", {}).get("name", "main")
-
-        query = """
-        query GetCommits($owner: String!, $name: String!, $branch: String!, $limit: Int!) {
-          repository(owner: $owner, name: $name) {
-            ref(qualifiedName: $branch) {
-              target {
-                ... on Commit {
-                  history(first: $limit) {
-                    nodes {
-                      oid
-                      messageHeadline
-                      message
-                      author {
-                        name
-                        email
-                        date
-                      }
-                    }
-                  }
-                }
-              }
-            }
-          }
-        }
-        """
-
-        variables = {"owner": owner, "name": repo, "branch": branch, "limit": limit}
+        async def _format(repository, request_id):
+            resolved_branch = _branch_name(repository, branch, owner, repo)
 
-        try:
-            result = await github_client.execute_query(
-                query=query,
-                variables=variables,
-                request_id=request_id
-            )
+            commit_obj = repository.get("object")
+            if not commit_obj:
+                raise ToolError(f"Branch '{resolved_branch}' not found in {owner}/{repo}")
 
-            repository = result.get("repository")
-            if not repository:
-                raise ToolError(f"Repository {owner}/{repo} not found")
+            history = commit_obj.get("history", {}).get("nodes", [])
 
-            ref = repository.get("ref")
-            if not ref:
-                raise ToolError(f"Branch '{branch}' not found in {owner}/{repo}")
-
-            history = ref.get("target", {}).get("history", {}).get("nodes", [])
-
-            # Format commits
-            commits = []
-            for commit in history:
-                author = commit.get("author", {})
-                commits.append({
-                    "sha": commit.get("oid"),
-                    "message_headline": commit.get("messageHeadline"),
-                    "message": commit.get("message"),
+            # Author is nullable in the schema
+            commits = [
+                {
+                    "sha": commit["oid"],
+                    "message_headline": commit["messageHeadline"],
+                    "message": commit["message"],
                     "author": {
-                        "name": author.get("name"),
+                        "name": (author := commit.get("author") or {}).get("name"),
                         "email": author.get("email"),
                         "date": author.get("date")
                     }
-                })
-
-            response = {
-                "success": True,
-                "owner": owner,
-                "repo": repo,
-                "branch": branch,
-                "commits": commits,
-                "count": len(commits)
-            }
-
-            logger.info(
-                "get_commits tool completed successfully",
-                extra={
-                    "request_id": request_id,
-                    "extra_fields": {
-                        "tool": "get_commits",
-                        "commits_count": len(commits)
-                    }
                 }
+                for commit in history
+            ]
+
+            response = CommitList(
+                owner=owner,
+                repo=repo,
+                branch=resolved_branch,
+                commits=commits,
+                count=len(commits)
             )
-
-            await ctx.info(f"Found {len(commits)} commits")
-
-            return response
-
-        except github_client.GitHubAPIError as e:
-            logger.error(
-                f"get_commits tool failed with GitHub API error: {str(e)}",
-                extra={
-                    "request_id": request_id,
-                    "extra_fields": {
-                        "tool": "get_commits",
-                        "error_type": "GitHubAPIError"
-                    }
-                },
-                exc_info=True
-            )
-            await ctx.error(f"GitHub API error: {str(e)}")
-            raise ToolError(str(e))
-
-        except Exception as e:
-            logger.error(
-                f"get_commits tool failed with unexpected error: {str(e)}",
-                extra={
-                    "request_id": request_id,
-                    "extra_fields": {
-                        "tool": "get_commits",
-                        "error_type": "UnexpectedError"
-                    }
-                },
-                exc_info=True
-            )
-            await ctx.error(f"Unexpected error: {str(e)}")
-            raise ToolError(f"Failed to get commits: {str(e)}")
+            return response, {"commits_count": len(commits)}, f"Found {len(commits)} commits"
+
+        # Fully qualified so a tag or SHA with the same name can't shadow the branch
+        revision = f"refs/heads/{branch}" if branch else "HEAD"
+        variables = {"owner": owner, "name": repo, "revision": revision, "limit": limit}
+
+        return await _run_graphql_tool(
+            ctx, "get_commits", _COMMITS_QUERY, variables, _format,
+            owner=owner, repo=repo,
+            start_message=f"Fetching commits for {owner}/{repo}",
+            failure="Failed to get commits",
+            extra_log={"branch": branch, "limit": limit}
+        )
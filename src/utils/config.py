@@ -1,4 +1,6 @@
 import os
+from types import MappingProxyType
+from typing import Mapping
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -11,18 +13,48 @@ class GitHubConfig:
         self.api_key = os.getenv("GITHUB_TOKEN", "")
         self.base_url = "https://api.github.com/graphql"
         self.timeout = int(os.getenv("GITHUB_TIMEOUT", "60"))
+        # Window for coalescing concurrent queries into one request; 0 disables batching
+        self.batch_window_ms = float(os.getenv("GITHUB_BATCH_WINDOW_MS", "5"))
+        # Seconds a successful response is reused for identical queries; 0 disables caching
+        self.cache_ttl = float(os.getenv("GITHUB_CACHE_TTL", "60"))
+        self.cache_max = int(os.getenv("GITHUB_CACHE_MAX", "256"))
+        self.cache_max_bytes = int(os.getenv("GITHUB_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+        # Limits on requests to GitHub; a rate of 0 leaves request starts unpaced
+        self.max_concurrency = int(os.getenv("GITHUB_MAX_CONCURRENCY", "10"))
+        self.max_rps = float(os.getenv("GITHUB_MAX_RPS", "0"))
+        # Retries for throttled or failed requests, with exponential backoff in seconds
+        self.max_retries = int(os.getenv("GITHUB_MAX_RETRIES", "3"))
+        self.backoff_base = float(os.getenv("GITHUB_BACKOFF_BASE", "0.5"))
+        self.backoff_max = float(os.getenv("GITHUB_BACKOFF_MAX", "30"))
+        # The token is fixed until reload_config(), so derived values are computed here
+        self._is_configured = bool(self.api_key and self.api_key.strip())
+        # Built once; read-only since every request shares it
+        self._headers = MappingProxyType({
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        })
 
     @property
-    def headers(self) -> dict:
+    def headers(self) -> Mapping[str, str]:
         """Get headers for GitHub API requests."""
-        return {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+        return self._headers
 
     def is_configured(self) -> bool:
         """Check if configuration is valid."""
-        return self.api_key is not None and len(self.api_key.strip()) > 0
+        return self._is_configured
 
 
 config = GitHubConfig()
+
+# The token doesn't change after startup, so hot paths read this flag
+# instead of calling config.is_configured() on every request
+IS_CONFIGURED: bool = config.is_configured()
+
+
+def reload_config() -> None:
+    """Re-read configuration from the environment and refresh IS_CONFIGURED."""
+    global IS_CONFIGURED
+
+    load_dotenv(override=True)
+    config.__init__()
+    IS_CONFIGURED = config.is_configured()
@@ -0,0 +1,33 @@
+import os
+import random
+import threading
+
+
+_local = threading.local()
+
+
+def _get_rng() -> random.Random:
+    """Get the calling thread's random generator, seeding it once from os.urandom."""
+    rng = getattr(_local, "rng", None)
+    if rng is None:
+        rng = random.Random(os.urandom(32))
+        _local.rng = rng
+    return rng
+
+
+def new_request_id() -> str:
+    """
+    Generate a random version 4 UUID string for request correlation.
+
+    Uses a per-thread PRNG instead of uuid.uuid4() to avoid an os.urandom
+    syscall and a UUID object per request. IDs are unique enough for log
+    correlation but are not suitable for security tokens.
+
+    Returns:
+        UUID string in the standard 8-4-4-4-12 format
+    """
+    b = bytearray(_get_rng().getrandbits(128).to_bytes(16, "big"))
+    b[6] = (b[6] & 0x0F) | 0x40
+    b[8] = (b[8] & 0x3F) | 0x80
+    h = b.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
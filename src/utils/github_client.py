@@ -1,31 +1,594 @@
 import aiohttp
+import asyncio
+import functools
+import logging
+import random
+import re
 import time
-import uuid
-from typing import Any, Dict, Optional
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+from . import json_codec
 from .config import config
+from .fastuuid import new_request_id
 from .logging import get_logger
 
 
 logger = get_logger(__name__)
 
+# Maximum number of queries merged into one batched request
+MAX_BATCH = 8
+
+# Connection pool limits for the shared session
+MAX_CONNECTIONS = 100
+MAX_CONNECTIONS_PER_HOST = 20
+# Seconds to cache DNS lookups and to keep idle connections open
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 60
+
+# Client-facing messages for HTTP statuses with a known cause
+_ERROR_TABLE = {
+    401: "Invalid or expired GitHub token",
+    403: "Rate limit exceeded or forbidden resource",
+    404: "Resource not found",
+}
+
+# Statuses worth retrying; 403 is retried too when GitHub says how long to wait
+_RETRYABLE_STATUSES = frozenset({429, 502, 503, 504})
+
+# Header and body of a single GraphQL query operation
+_OPERATION_RE = re.compile(
+    r"^\s*query\b[^({]*(?:\((?P<declarations>[^)]*)\))?\s*\{(?P<body>.*)\}\s*$",
+    re.S
+)
+_VARIABLE_RE = re.compile(r"\$(\w+)")
+# String literals (kept verbatim) or runs of insignificant whitespace, commas and # comments
+_WHITESPACE_RE = re.compile(r'("(?:\\.|[^"\\])*")|(?:[\s,]|#[^\n]*)+')
+_FIELD_RE = re.compile(r"\s*(\w+)")
+
+# Cache key for a query: (minified query, variables serialized with sorted keys)
+_CacheKey = Tuple[str, bytes]
+
+# Decoded response body and the size in bytes of the raw response it came from
+_Response = Tuple[Dict[str, Any], int]
+
+# Query waiting for a batch: ((declarations, field, selection), variables, query, future)
+_PendingQuery = Tuple[Tuple[str, str, str], Dict[str, Any], str, asyncio.Future]
+
 
 class GitHubAPIError(Exception):
-    """Exception raised for GitHub API errors."""
-    pass
+    """
+    Exception raised for GitHub API errors.
+
+    Attributes:
+        status: HTTP status of the failed response, or None for GraphQL,
+            network and unexpected errors
+        request_id: Request ID of the failed query
+    """
+
+    def __init__(
+        self,
+        message: str,
+        *,
+        status: Optional[int] = None,
+        request_id: Optional[str] = None
+    ):
+        super().__init__(message)
+        self.status = status
+        self.request_id = request_id
+
+
+@functools.lru_cache(maxsize=128)
+def minify_query(query: str) -> str:
+    """
+    Collapse insignificant whitespace and commas and drop comments in a GraphQL document.
+
+    GitHub does not support persisted queries, so the full text is sent on
+    every request; minifying it keeps the request body small. Results are
+    cached since callers reuse a handful of constant queries.
+
+    Args:
+        query: GraphQL query string
+
+    Returns:
+        Equivalent query string on a single line
+    """
+    return _WHITESPACE_RE.sub(lambda m: m.group(1) or " ", query).strip()
+
+
+def _split_operation(query: str) -> Optional[Tuple[str, str, str]]:
+    """
+    Split a query into the parts needed to merge it into a batch.
+
+    Only queries with exactly one unaliased top-level field can be merged,
+    since the field is aliased per operation to keep results apart.
+
+    Args:
+        query: GraphQL query string
+
+    Returns:
+        (variable declarations, top-level field name, top-level selection),
+        or None if the query can't be batched
+    """
+    match = _OPERATION_RE.match(query)
+    if not match:
+        return None
+
+    body = match.group("body")
+    field = _FIELD_RE.match(body)
+    if not field or body[field.end():].lstrip().startswith(":"):
+        return None
+
+    # The selection must close exactly at the end of the body
+    depth = 0
+    for i, char in enumerate(body):
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                if body[i + 1:].strip():
+                    return None
+                return match.group("declarations") or "", field.group(1), body.strip()
+    return None
+
+
+def _resolve(
+    future: asyncio.Future,
+    result: Optional[_Response] = None,
+    exception: Optional[BaseException] = None
+) -> None:
+    """Settle a batched query's future unless its caller was cancelled."""
+    if future.done():
+        return
+    if exception is not None:
+        future.set_exception(exception)
+    else:
+        future.set_result(result)
+
+
+class _GraphQLBatcher:
+    """Coalesces queries issued within a short window into one request."""
+
+    def __init__(self):
+        self._queue: Optional["asyncio.Queue[_PendingQuery]"] = None
+        self._worker: Optional[asyncio.Task] = None
+        # Keeps in-flight batch requests alive until they complete
+        self._dispatches: Set[asyncio.Task] = set()
+
+    async def submit(
+        self,
+        operation: Tuple[str, str, str],
+        variables: Optional[Dict[str, Any]],
+        query: str
+    ) -> _Response:
+        """
+        Queue a query for the next batch and wait for its share of the response.
+
+        Args:
+            operation: Parts of the query from _split_operation
+            variables: Query variables dictionary
+            query: Original query string, sent as-is when batched alone
+
+        Returns:
+            Response body for this query with "data" and optional "errors",
+            and its approximate size
+        """
+        if self._worker is None or self._worker.done():
+            # Bind the queue to the running loop along with the worker
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._consume())
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((operation, variables or {}, query, future))
+        return await future
+
+    async def _consume(self) -> None:
+        """Collect queries for one batch window, then send them together."""
+        while True:
+            batch = [await self._queue.get()]
+            await asyncio.sleep(config.batch_window_ms / 1000)
+            while len(batch) < MAX_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+
+            task = asyncio.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch_alone(self, entry: _PendingQuery) -> None:
+        """
+        Send one queued query as-is and resolve its future.
+
+        Args:
+            entry: Queued (operation, variables, query, future) entry
+        """
+        _, variables, query, future = entry
+        try:
+            response = await _post(query, variables)
+        except Exception as e:
+            _resolve(future, exception=e)
+        else:
+            _resolve(future, result=response)
+
+    async def _dispatch(self, batch: List[_PendingQuery]) -> None:
+        """
+        Send a batch as one request and resolve each query's future.
+
+        Args:
+            batch: Queued (operation, variables, query, future) entries
+        """
+        if len(batch) == 1:
+            await self._dispatch_alone(batch[0])
+            return
+
+        declarations = []
+        selections = []
+        merged_variables = {}
+        for i, ((op_declarations, _, selection), variables, _, _) in enumerate(batch):
+            prefix = f"op{i}_"
+            if op_declarations:
+                declarations.append(_VARIABLE_RE.sub(rf"${prefix}\1", op_declarations))
+            selections.append(f"op{i}: " + _VARIABLE_RE.sub(rf"${prefix}\1", selection))
+            for name, value in variables.items():
+                merged_variables[prefix + name] = value
+
+        header = f"({', '.join(declarations)})" if declarations else ""
+        query = f"query Batched{header} {{\n" + "\n".join(selections) + "\n}"
+
+        try:
+            body, size = await _post(query, merged_variables)
+        except Exception as e:
+            for *_, future in batch:
+                _resolve(future, exception=e)
+            return
+
+        data = body.get("data") or {}
+        errors = body.get("errors") or []
+        if any(not e.get("path") for e in errors):
+            # Errors without a path concern the whole document, such as a node
+            # or complexity limit the merged query hit; retry each query alone
+            # so one that succeeds by itself isn't failed with the rest
+            await asyncio.gather(*(self._dispatch_alone(entry) for entry in batch))
+            return
+
+        # Measuring each share would mean encoding it again; an even split
+        # of the merged size keeps the cache's byte total right overall
+        share = size // len(batch)
+        for i, ((_, field, _), _, _, future) in enumerate(batch):
+            alias = f"op{i}"
+            op_errors = [e for e in errors if e["path"][0] == alias]
+            result: Dict[str, Any] = {"data": {field: data.get(alias)}}
+            if op_errors:
+                result["errors"] = op_errors
+            _resolve(future, result=(result, share))
+
+
+_batcher = _GraphQLBatcher()
+
+
+class _RateLimiter:
+    """Spaces request starts at least 1/rate seconds apart."""
+
+    __slots__ = ("_interval", "_next_start")
+
+    def __init__(self, rate: float):
+        self._interval = 1 / rate
+        self._next_start = 0.0
+
+    async def acquire(self) -> None:
+        """Wait for this caller's start slot."""
+        now = time.monotonic()
+        # Reserve the slot before sleeping so concurrent callers queue up behind it
+        start = max(now, self._next_start)
+        self._next_start = start + self._interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+# Shared session so connections (and TLS handshakes) are reused across queries
+_session: Optional[aiohttp.ClientSession] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+# Request limits, created along with the session since the semaphore is loop-bound
+_request_slots: Optional[asyncio.Semaphore] = None
+_limiter: Optional[_RateLimiter] = None
+
+
+def _get_session() -> aiohttp.ClientSession:
+    """
+    Get the shared client session, creating it on first use in the running loop.
+
+    Headers, the request timeout and the request limits are set up with the
+    session, so they are built once rather than per request; call
+    close_session() after reloading config.
+    The check and creation involve no await, so concurrent callers on the
+    loop cannot both create a session and no lock is needed.
+
+    Returns:
+        Open ClientSession bound to the running event loop
+    """
+    global _session, _session_loop, _request_slots, _limiter
+
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=MAX_CONNECTIONS,
+                limit_per_host=MAX_CONNECTIONS_PER_HOST,
+                ttl_dns_cache=DNS_CACHE_TTL,
+                keepalive_timeout=KEEPALIVE_TIMEOUT
+            ),
+            headers=config.headers,
+            timeout=aiohttp.ClientTimeout(total=config.timeout)
+        )
+        _session_loop = loop
+        _request_slots = asyncio.Semaphore(config.max_concurrency)
+        _limiter = _RateLimiter(config.max_rps) if config.max_rps > 0 else None
+    return _session
+
+
+async def close_session() -> None:
+    """Close the shared client session, if one is open."""
+    global _session
+
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+def _advised_wait(headers: Any) -> Optional[float]:
+    """
+    Get how long GitHub asked the client to wait before retrying.
+
+    Args:
+        headers: Response headers
+
+    Returns:
+        Seconds from Retry-After or the rate limit reset time, or None if not given
+    """
+    if not headers:
+        return None
+
+    retry_after = headers.get("Retry-After", "")
+    if retry_after.isdigit():
+        return float(retry_after)
+
+    reset = headers.get("X-RateLimit-Reset", "")
+    if headers.get("X-RateLimit-Remaining") == "0" and reset.isdigit():
+        return max(0.0, int(reset) - time.time())
+
+    return None
+
+
+def _retry_delay(error: aiohttp.ClientError, attempt: int) -> Optional[float]:
+    """
+    Get the backoff before retrying a failed request.
+
+    Args:
+        error: Error the request failed with
+        attempt: Number of retries already made
+
+    Returns:
+        Seconds to wait, or None if the error is not retryable or GitHub
+        asked for a longer wait than GITHUB_BACKOFF_MAX
+    """
+    advised = None
+    if isinstance(error, aiohttp.ClientResponseError):
+        advised = _advised_wait(error.headers)
+        if error.status not in _RETRYABLE_STATUSES and not (error.status == 403 and advised is not None):
+            return None
+    elif not isinstance(error, aiohttp.ClientConnectionError):
+        return None
+
+    delay = min(config.backoff_max, config.backoff_base * 2 ** attempt)
+    if advised is not None:
+        if advised > config.backoff_max:
+            return None
+        delay = max(delay, advised)
+
+    # Jitter so concurrent retries don't arrive together
+    return delay + random.uniform(0, 0.1)
+
+
+async def _post(query: str, variables: Optional[Dict[str, Any]]) -> _Response:
+    """
+    POST a GraphQL document and decode the response body.
+
+    Args:
+        query: GraphQL query string
+        variables: Query variables dictionary
+
+    Returns:
+        Decoded response body with "data" and optional "errors", and the
+        size of the raw body in bytes
+
+    Transient failures (throttling, gateway errors, dropped connections)
+    are retried up to GITHUB_MAX_RETRIES times with exponential backoff.
+
+    Raises:
+        aiohttp.ClientError: If the request fails or returns an HTTP error status
+    """
+    payload = {"query": query}
+    if variables:
+        payload["variables"] = variables
+    data = json_codec.dumps(payload)
+
+    session = _get_session()
+    attempt = 0
+    while True:
+        try:
+            # Cap concurrent requests and pace their starts to stay under GitHub's secondary limits
+            async with _request_slots:
+                if _limiter is not None:
+                    await _limiter.acquire()
+                async with session.post(config.base_url, data=data) as response:
+                    response.raise_for_status()
+                    # Decode the raw body with orjson (when installed) instead of aiohttp's json()
+                    raw = await response.read()
+                    return json_codec.loads(raw), len(raw)
+        except aiohttp.ClientError as e:
+            delay = _retry_delay(e, attempt) if attempt < config.max_retries else None
+            if delay is None:
+                raise
+
+            logger.warning(
+                "Retrying GitHub API request in %.2fs after %s",
+                delay,
+                type(e).__name__,
+                extra={
+                    "extra_fields": {
+                        "attempt": attempt + 1,
+                        "status_code": getattr(e, "status", None)
+                    }
+                }
+            )
+
+        # Sleep without holding a request slot
+        attempt += 1
+        await asyncio.sleep(delay)
+
+
+# Recent successful response bodies by query with their encoded sizes, least recently used first
+_cache: "OrderedDict[_CacheKey, Tuple[float, Dict[str, Any], int]]" = OrderedDict()
+# Total encoded size of the cached bodies
+_cache_bytes = 0
+# Requests in flight, shared by concurrent callers issuing the same query
+_inflight: Dict[_CacheKey, asyncio.Future] = {}
+
+
+async def _fetch(query: str, variables: Optional[Dict[str, Any]]) -> _Response:
+    """
+    Send a query, through the batcher when it can be merged with others.
+
+    Args:
+        query: Minified GraphQL query string
+        variables: Query variables dictionary
+
+    Returns:
+        Decoded response body with "data" and optional "errors", and its
+        approximate size in bytes
+    """
+    operation = _split_operation(query) if config.batch_window_ms > 0 else None
+    if operation is not None:
+        return await _batcher.submit(operation, variables, query)
+    return await _post(query, variables)
+
+
+def _store(key: _CacheKey, task: asyncio.Future) -> None:
+    """Cache a finished request's body if it succeeded, and stop sharing it."""
+    global _cache_bytes
+    _inflight.pop(key, None)
+    # Retrieving the exception keeps asyncio from warning when no caller is left
+    if task.cancelled() or task.exception() is not None:
+        return
+
+    body, size = task.result()
+    if "errors" in body:
+        return
+
+    # Blob text can make a single body large; skip those rather than flush the cache
+    if size > config.cache_max_bytes:
+        return
+
+    _cache[key] = (time.monotonic(), body, size)
+    _cache_bytes += size
+    while len(_cache) > config.cache_max or _cache_bytes > config.cache_max_bytes:
+        _cache_bytes -= _cache.popitem(last=False)[1][2]
+
+
+async def _fetch_cached(query: str, variables: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Send a query unless a fresh response is cached or the same query is in flight.
+
+    Args:
+        query: Minified GraphQL query string
+        variables: Query variables dictionary
+
+    Returns:
+        Decoded response body, shared with other callers; treat it as read-only
+    """
+    global _cache_bytes
+    key = (query, json_codec.dumps(variables or {}, sort_keys=True))
+
+    entry = _cache.get(key)
+    if entry is not None:
+        if time.monotonic() - entry[0] < config.cache_ttl:
+            _cache.move_to_end(key)
+            return entry[1]
+        del _cache[key]
+        _cache_bytes -= entry[2]
+
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_fetch(query, variables))
+        task.add_done_callback(functools.partial(_store, key))
+        _inflight[key] = task
+
+    # One caller being cancelled must not cancel the request for the others
+    body, _ = await asyncio.shield(task)
+    return body
+
+
+def _handle_error(error: Exception, start_time: float, request_id: str) -> GitHubAPIError:
+    """
+    Log a failed request and convert its error into a GitHubAPIError.
+
+    Args:
+        error: Error raised while sending the request or decoding the response
+        start_time: Epoch seconds when the request started
+        request_id: Request ID for tracking
+
+    Returns:
+        GitHubAPIError with a client-facing message, for the caller to raise
+    """
+    status = None
+    if isinstance(error, aiohttp.ClientResponseError):
+        status = error.status
+        log_message = "GitHub API error: %s"
+        error_msg = _ERROR_TABLE.get(error.status) or f"API request failed: {error.status} {error.message}"
+        extra_fields = {"status_code": error.status, "error_type": "ClientResponseError"}
+    elif isinstance(error, aiohttp.ClientError):
+        log_message = "GitHub API network error: %s"
+        error_msg = f"Network error: {error}"
+        extra_fields = {"error_type": "ClientError"}
+    else:
+        log_message = "GitHub API unexpected error: %s"
+        error_msg = f"Unexpected error: {error}"
+        extra_fields = {"error_type": "UnexpectedError"}
+
+    logger.error(
+        log_message,
+        error_msg,
+        extra={
+            "request_id": request_id,
+            "execution_time_ms": (time.time() - start_time) * 1000,
+            "extra_fields": extra_fields
+        },
+        exc_info=error
+    )
+    return GitHubAPIError(error_msg, status=status, request_id=request_id)
 
 
 async def execute_query(
     query: str,
     variables: Optional[Dict[str, Any]] = None,
-    request_id: Optional[str] = None
+    request_id: Optional[str] = None,
+    cache: bool = True
 ) -> Dict[str, Any]:
     """
     Execute a GraphQL query against GitHub API.
 
+    Queries with a single top-level field are coalesced with other queries
+    issued within GITHUB_BATCH_WINDOW_MS into one request. Successful
+    responses are reused for GITHUB_CACHE_TTL seconds, and concurrent
+    identical queries share one request.
+
     Args:
         query: GraphQL query string
         variables: Query variables dictionary
         request_id: Optional request ID for tracking (generated if not provided)
+        cache: Reuse cached and in-flight responses (disable for mutations)
 
     Returns:
         Dictionary containing the response data
@@ -33,135 +596,69 @@ async def execute_query(
     Raises:
         GitHubAPIError: If the API request fails
     """
-    # Generate request_id if not provided
+    # Tools pass the middleware's request ID; generate one only for direct callers
     if request_id is None:
-        request_id = str(uuid.uuid4())
+        request_id = new_request_id()
 
     start_time = time.time()
-
-    # Build request payload
-    payload = {"query": query}
-    if variables:
-        payload["variables"] = variables
+    log_info = logger.isEnabledFor(logging.INFO)
 
     # Log API request
-    logger.info(
-        "GitHub API request started",
-        extra={
-            "request_id": request_id,
-            "extra_fields": {
-                "variables": variables
-            }
-        }
-    )
-
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                config.base_url,
-                headers=config.headers,
-                json=payload,
-                timeout=aiohttp.ClientTimeout(total=config.timeout)
-            ) as response:
-                response.raise_for_status()
-                data = await response.json()
-
-                # Check for GraphQL errors
-                if "errors" in data:
-                    errors = data["errors"]
-                    error_messages = [e.get("message", "Unknown error") for e in errors]
-                    error_msg = "; ".join(error_messages)
-
-                    execution_time_ms = (time.time() - start_time) * 1000
-                    logger.error(
-                        f"GitHub GraphQL error: {error_msg}",
-                        extra={
-                            "request_id": request_id,
-                            "execution_time_ms": execution_time_ms,
-                            "extra_fields": {
-                                "error_type": "GraphQLError",
-                                "errors": errors
-                            }
-                        }
-                    )
-                    raise GitHubAPIError(error_msg)
-
-                # Calculate execution time
-                execution_time_ms = (time.time() - start_time) * 1000
-
-                # Log successful response
-                logger.info(
-                    "GitHub API request successful",
-                    extra={
-                        "request_id": request_id,
-                        "execution_time_ms": execution_time_ms,
-                        "extra_fields": {}
-                    }
-                )
-
-                return data.get("data", {})
-
-    except aiohttp.ClientResponseError as e:
-        execution_time_ms = (time.time() - start_time) * 1000
-        error_msg = ""
-
-        if e.status == 401:
-            error_msg = "Invalid or expired GitHub token"
-        elif e.status == 403:
-            error_msg = "Rate limit exceeded or forbidden resource"
-        elif e.status == 404:
-            error_msg = "Resource not found"
-        else:
-            error_msg = f"API request failed: {e.status} {e.message}"
-
-        logger.error(
-            f"GitHub API error: {error_msg}",
+    if log_info:
+        logger.info(
+            "GitHub API request started",
             extra={
                 "request_id": request_id,
-                "execution_time_ms": execution_time_ms,
                 "extra_fields": {
-                    "status_code": e.status,
-                    "error_type": "ClientResponseError"
+                    "variables": variables
                 }
-            },
-            exc_info=True
+            }
         )
-        raise GitHubAPIError(error_msg)
 
-    except aiohttp.ClientError as e:
-        execution_time_ms = (time.time() - start_time) * 1000
-        error_msg = f"Network error: {str(e)}"
+    try:
+        query = minify_query(query)
+        if cache and config.cache_ttl > 0:
+            data = await _fetch_cached(query, variables)
+        else:
+            data, _ = await _fetch(query, variables)
 
-        logger.error(
-            f"GitHub API network error: {error_msg}",
-            extra={
-                "request_id": request_id,
-                "execution_time_ms": execution_time_ms,
-                "extra_fields": {
-                    "error_type": "ClientError"
+        # Check for GraphQL errors
+        if "errors" in data:
+            errors = data["errors"]
+            error_messages = [e.get("message", "Unknown error") for e in errors]
+            error_msg = "; ".join(error_messages)
+
+            execution_time_ms = (time.time() - start_time) * 1000
+            logger.error(
+                "GitHub GraphQL error: %s",
+                error_msg,
+                extra={
+                    "request_id": request_id,
+                    "execution_time_ms": execution_time_ms,
+                    "extra_fields": {
+                        "error_type": "GraphQLError",
+                        "errors": errors
+                    }
                 }
-            },
-            exc_info=True
-        )
-        raise GitHubAPIError(error_msg)
+            )
+            raise GitHubAPIError(error_msg, request_id=request_id)
+
+        # Log successful response
+        if log_info:
+            logger.info(
+                "GitHub API request successful",
+                extra={
+                    "request_id": request_id,
+                    "execution_time_ms": (time.time() - start_time) * 1000,
+                    "extra_fields": {}
+                }
+            )
+
+        return data.get("data", {})
 
     except GitHubAPIError:
         # Re-raise GitHubAPIError without wrapping
         raise
 
     except Exception as e:
-        execution_time_ms = (time.time() - start_time) * 1000
-        error_msg = f"Unexpected error: {str(e)}"
-
-        logger.error(
-            f"GitHub API unexpected error: {error_msg}",
-            extra={
-                "request_id": request_id,
-                "execution_time_ms": execution_time_ms,
-                "extra_fields": {
-                    "error_type": "UnexpectedError"
-                }
-            },
-            exc_info=True
-        )
-        raise GitHubAPIError(error_msg)
+        raise _handle_error(e, start_time, request_id) from e
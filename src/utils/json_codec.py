@@ -0,0 +1,46 @@
+import json
+from typing import Any, Callable, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(
+    obj: Any,
+    indent: bool = False,
+    default: Optional[Callable[[Any], Any]] = None,
+    sort_keys: bool = False
+) -> bytes:
+    """
+    Serialize an object to UTF-8 encoded JSON, using orjson when installed.
+
+    Args:
+        obj: Object to serialize
+        indent: Pretty-print with two-space indentation
+        default: Fallback serializer for unsupported types
+        sort_keys: Emit object keys in sorted order
+
+    Returns:
+        JSON document as bytes
+    """
+    if orjson is not None:
+        option = (orjson.OPT_INDENT_2 if indent else 0) | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(obj, default=default, option=option or None)
+    return json.dumps(obj, indent=2 if indent else None, default=default, sort_keys=sort_keys).encode()
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """
+    Deserialize a JSON document, using orjson when installed.
+
+    Args:
+        data: JSON document as bytes or str
+
+    Returns:
+        Deserialized object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -1,7 +1,40 @@
+import atexit
 import logging
-import json
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener
 from typing import Any, Dict, Optional
-from datetime import datetime, timezone
+
+from . import json_codec
+
+
+# Epoch second and its formatted date and time, shared by records within that second
+_second_prefix = (0, "1970-01-01T00:00:00")
+
+
+def _format_timestamp(created: float) -> str:
+    """
+    Format an epoch time as ISO 8601 UTC with microseconds.
+
+    The date and time are formatted once per second and reused, since
+    bursts of records share them; only the microseconds change.
+
+    Args:
+        created: Epoch seconds, as in LogRecord.created
+
+    Returns:
+        Timestamp such as "2024-01-01T12:00:00.123456+00:00"
+    """
+    global _second_prefix
+
+    second = int(created)
+    cached_second, prefix = _second_prefix
+    if second != cached_second:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+        # One assignment, so threads formatting concurrently never see a torn pair
+        _second_prefix = (second, prefix)
+
+    return f"{prefix}.{int((created - second) * 1_000_000):06d}+00:00"
 
 
 class StructuredFormatter(logging.Formatter):
@@ -10,29 +43,99 @@ class StructuredFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:
         """Format log record as JSON."""
         log_data = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            # When the record was created, rather than a second clock read here
+            "timestamp": _format_timestamp(record.created),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
         }
 
+        # Fields passed via extra= land in the record's __dict__
+        fields = record.__dict__
+
         # Add request_id if present
-        if hasattr(record, "request_id"):
-            log_data["request_id"] = record.request_id
+        request_id = fields.get("request_id")
+        if request_id is not None:
+            log_data["request_id"] = request_id
 
         # Add execution_time_ms if present
-        if hasattr(record, "execution_time_ms"):
-            log_data["execution_time_ms"] = record.execution_time_ms
+        execution_time_ms = fields.get("execution_time_ms")
+        if execution_time_ms is not None:
+            log_data["execution_time_ms"] = execution_time_ms
 
         # Add any extra fields
-        if hasattr(record, "extra_fields"):
-            log_data.update(record.extra_fields)
+        extra_fields = fields.get("extra_fields")
+        if extra_fields:
+            log_data.update(extra_fields)
 
         # Add exception info if present
         if record.exc_info:
             log_data["exception"] = self.formatException(record.exc_info)
 
-        return json.dumps(log_data)
+        # orjson when installed; str() anything else so one odd field can't drop the record
+        return json_codec.dumps(log_data, default=str).decode()
+
+
+# Keyword arguments consumed by Logger._log itself
+_LOG_KWARGS = frozenset({"exc_info", "stack_info", "stacklevel", "extra"})
+
+# Fields StructuredFormatter emits at the top level rather than from extra_fields
+_RECORD_FIELDS = ("request_id", "execution_time_ms")
+
+
+class StructuredAdapter(logging.LoggerAdapter):
+    """
+    Logger adapter that turns keyword arguments into structured log fields.
+
+    Call sites pass fields directly, e.g.
+    ``logger.info("Tool done", tool_name=tool_name, success=True)``,
+    and the adapter merges them with its fixed base fields.
+    """
+
+    def process(self, msg: Any, kwargs: Dict[str, Any]):
+        """Move structured keyword arguments into the record's extra dict."""
+        fields = dict(self.extra) if self.extra else {}
+        for key in [k for k in kwargs if k not in _LOG_KWARGS]:
+            fields[key] = kwargs.pop(key)
+
+        extra = kwargs.get("extra") or {}
+        for key in _RECORD_FIELDS:
+            if key in fields:
+                extra[key] = fields.pop(key)
+        extra["extra_fields"] = fields
+        kwargs["extra"] = extra
+
+        return msg, kwargs
+
+
+# Records queued by every logger and written to stderr by one listener thread
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_listener: Optional[QueueListener] = None
+
+
+def _get_queue_handler() -> QueueHandler:
+    """
+    Create a handler that queues records for the shared listener thread.
+
+    Records are formatted as JSON before they are queued, so the listener
+    only writes them and the event loop never blocks on stderr.
+
+    Returns:
+        QueueHandler feeding the shared log queue
+    """
+    global _listener
+
+    if _listener is None:
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter("%(message)s"))
+        _listener = QueueListener(_log_queue, stream_handler)
+        _listener.start()
+        # Drain queued records before the interpreter exits
+        atexit.register(_listener.stop)
+
+    handler = QueueHandler(_log_queue)
+    handler.setFormatter(StructuredFormatter())
+    return handler
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -48,10 +151,7 @@ def get_logger(name: str) -> logging.Logger:
     logger = logging.getLogger(name)
 
     if not logger.handlers:
-        handler = logging.StreamHandler()
-        formatter = StructuredFormatter()
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
+        logger.addHandler(_get_queue_handler())
         logger.setLevel(logging.INFO)
 
     return logger
@@ -66,7 +166,7 @@ def log_tool_call(logger: logging.Logger, tool_name: str, params: Dict[str, Any]
         tool_name: Name of the tool being called
         params: Tool parameters
     """
-    logger.info(f"Tool call: {tool_name} - Params: {params}")
+    logger.info("Tool call: %s - Params: %s", tool_name, params)
 
 
 def log_api_request(logger: logging.Logger, endpoint: str, params: Optional[Dict[str, Any]] = None) -> None:
@@ -78,7 +178,7 @@ def log_api_request(logger: logging.Logger, endpoint: str, params: Optional[Dict
         endpoint: API endpoint
         params: Request parameters
     """
-    logger.info(f"API request: {endpoint} - Params: {params}")
+    logger.info("API request: %s - Params: %s", endpoint, params)
 
 
 def log_api_response(logger: logging.Logger, endpoint: str, success: bool, count: int = 0) -> None:
@@ -91,5 +191,23 @@ def log_api_response(logger: logging.Logger, endpoint: str, success: bool, count
         success: Whether the request was successful
         count: Number of items returned
     """
-    status = "success" if success else "failed"
-    logger.info(f"API response: {endpoint} - Status: {status} - Count: {count}")
+    logger.info(
+        "API response: %s - Status: %s - Count: %d",
+        endpoint,
+        "success" if success else "failed",
+        count
+    )
+
+
+def get_structured_logger(name: str, **base_fields: Any) -> StructuredAdapter:
+    """
+    Get a configured logger that accepts structured fields as keyword arguments.
+
+    Args:
+        name: Logger name (usually __name__)
+        **base_fields: Fields added to every record from this logger
+
+    Returns:
+        StructuredAdapter wrapping the configured logger
+    """
+    return StructuredAdapter(get_logger(name), base_fields)
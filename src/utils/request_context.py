@@ -0,0 +1,5 @@
+from contextvars import ContextVar
+
+
+# Request ID of the tool call being handled, set once by the outermost middleware
+REQUEST_ID: ContextVar[str] = ContextVar("request_id")
@@ -1,8 +1,25 @@
-import json
+import functools
 import os
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, List
+
+from . import json_codec
+from .logging import get_logger
+
+
+logger = get_logger(__name__)
+
+
+_BASE_DIR = Path(__file__).parent.parent.parent / "database"
+
+
+@functools.lru_cache(maxsize=256)
+def _resolve_path(schema: str) -> Path:
+    """Resolve a schema's database file, creating its directory on first use."""
+    schema_path = _BASE_DIR / schema
+    schema_path.parent.mkdir(parents=True, exist_ok=True)
+    return schema_path.with_suffix(".json")
 
 
 def get_database_path(schema: str) -> Path:
@@ -15,15 +32,12 @@ def get_database_path(schema: str) -> Path:
     Returns:
         Path object for the database file
     """
-    base_dir = Path(__file__).parent.parent.parent / "database"
-    schema_path = base_dir / schema
-    schema_path.parent.mkdir(parents=True, exist_ok=True)
-    return schema_path.with_suffix(".json")
+    return _resolve_path(schema)
 
 
 def save_to_database(schema: str, data: Dict[str, Any]) -> str:
     """
-    Save data to JSON database.
+    Save data to JSON database, atomically replacing any previous file.
 
     Args:
         schema: Schema name (e.g., "tools/repo/get_repository_info")
@@ -40,8 +54,11 @@ def save_to_database(schema: str, data: Dict[str, Any]) -> str:
         "data": data
     }
 
-    with open(file_path, "w") as f:
-        json.dump(data_with_timestamp, f, indent=2)
+    # Write a sibling file and swap it in, so readers never see a partial summary
+    tmp_path = file_path.with_suffix(".json.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(json_codec.dumps(data_with_timestamp, indent=True))
+    os.replace(tmp_path, file_path)
 
     return str(file_path)
 
@@ -61,5 +78,100 @@ def load_from_database(schema: str) -> Dict[str, Any]:
     if not file_path.exists():
         return {}
 
-    with open(file_path, "r") as f:
-        return json.load(f)
+    with open(file_path, "rb") as f:
+        return json_codec.loads(f.read())
+
+
+def get_log_path(schema: str) -> Path:
+    """
+    Get the path for a schema's append-only event log.
+
+    Args:
+        schema: Schema name (e.g., "middleware/usage/get_readme")
+
+    Returns:
+        Path object for the NDJSON log file, next to the schema's JSON file
+    """
+    return get_database_path(schema).with_suffix(".ndjson")
+
+
+def append_to_log(schema: str, records: Iterable[Dict[str, Any]]) -> str:
+    """
+    Append records to an NDJSON event log in a single O_APPEND write.
+
+    A line left unterminated by an interrupted write is closed off first, so
+    the new records don't merge into it.
+
+    Args:
+        schema: Schema name (e.g., "middleware/usage/get_readme")
+        records: Records to append, one JSON line each
+
+    Returns:
+        Path to the log file
+    """
+    file_path = get_log_path(schema)
+    payload = b"".join(json_codec.dumps(record) + b"\n" for record in records)
+
+    fd = os.open(file_path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        size = os.fstat(fd).st_size
+        if size and os.pread(fd, 1, size - 1) != b"\n":
+            payload = b"\n" + payload
+        os.write(fd, payload)
+    finally:
+        os.close(fd)
+
+    return str(file_path)
+
+
+def read_log(schema: str) -> List[Dict[str, Any]]:
+    """
+    Read all records from an NDJSON event log, skipping lines that don't decode.
+
+    Args:
+        schema: Schema name (e.g., "middleware/usage/get_readme")
+
+    Returns:
+        Logged records in append order, or empty list if the log doesn't exist
+    """
+    file_path = get_log_path(schema)
+
+    if not file_path.exists():
+        return []
+
+    records = []
+    with open(file_path, "rb") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                records.append(json_codec.loads(line))
+            except ValueError as e:
+                # A torn write must not block compaction of the rest of the log
+                logger.warning(
+                    "Skipping malformed line %d in %s: %s",
+                    line_number,
+                    file_path,
+                    e,
+                    extra={
+                        "extra_fields": {
+                            "log_path": str(file_path),
+                            "line_number": line_number
+                        }
+                    }
+                )
+    return records
+
+
+def truncate_log(schema: str) -> None:
+    """
+    Empty an NDJSON event log after its records have been compacted.
+
+    Args:
+        schema: Schema name (e.g., "middleware/usage/get_readme")
+    """
+    file_path = get_log_path(schema)
+
+    if file_path.exists():
+        with open(file_path, "wb"):
+            pass
@@ -41,12 +41,24 @@ def test_imports():
         from src.utils.storage import save_to_database, load_from_database
         print("  storage utilities imported")
 
+        from src.utils.json_codec import dumps, loads
+        print("  json_codec imported")
+
+        from src.utils.fastuuid import new_request_id
+        print("  fastuuid imported")
+
+        from src.utils.request_context import REQUEST_ID
+        print("  request_context imported")
+
         from src.middleware.auth_middleware import GitHubAuthMiddleware
         print("  GitHubAuthMiddleware imported")
 
         from src.middleware.usage_middleware import GitHubUsageTrackingMiddleware
         print("  GitHubUsageTrackingMiddleware imported")
 
+        from src.tools.repo.models import RepositoryInfo
+        print("  repo models imported")
+
         from src.tools.repo.repo_reader import register_repo_reader_tools
         print("  register_repo_reader_tools imported")
 
@@ -71,14 +83,14 @@ def test_server_initialization():
         mcp = FastMCP(name="GitHub Reader MCP Server")
         print("  Server instance created")
 
-        # Register middleware
-        register_all_middleware(mcp)
-        print("  Middleware registered")
-
         # Register tools
         register_repo_tools(mcp)
         print("  Tools registered")
 
+        # Register middleware
+        register_all_middleware(mcp)
+        print("  Middleware registered")
+
         print("Server initialization successful!\n")
         return True
 
@@ -112,6 +124,230 @@ def test_config():
         return False
 
 
+def test_validation():
+    """Test that tool arguments are validated before any request."""
+    print("Testing argument validation...")
+
+    try:
+        from fastmcp.exceptions import ToolError
+        from src.tools.repo.repo_reader import _validate
+
+        for owner, repo in [("octocat", "Hello-World"), ("octocat", ".github"), ("my-org", "_private.repo")]:
+            _validate(owner, repo, "docs/README.md")
+            print(f"  Accepted {owner}/{repo}")
+
+        for owner, repo, path in [
+            ("bad owner", "repo", None),
+            ("-octocat", "repo", None),
+            ("octocat", "bad/name", None),
+            ("octocat", "..", None),
+            ("octocat", "repo", "a\nb"),
+        ]:
+            try:
+                _validate(owner, repo, path)
+            except ToolError:
+                print(f"  Rejected {owner!r}/{repo!r} path={path!r}")
+            else:
+                print(f"  Accepted malformed {owner!r}/{repo!r} path={path!r}")
+                return False
+
+        print("Argument validation test successful!\n")
+        return True
+
+    except Exception as e:
+        print(f"  Validation error: {e}")
+        return False
+
+
+def test_minify_query():
+    """Test that minifying drops comments but keeps string literals intact."""
+    print("Testing query minification...")
+
+    try:
+        from src.utils.github_client import minify_query
+
+        cases = [
+            (
+                "query {\n  viewer { # who am I\n    login\n  }\n}",
+                "query { viewer { login } }",
+            ),
+            (
+                'query {\n  search(query: "a # b, c", type: REPOSITORY, first: 1) { repositoryCount }\n}',
+                'query { search(query: "a # b, c" type: REPOSITORY first: 1) { repositoryCount } }',
+            ),
+            (
+                'query {\n  search(query: "say \\"hi, # there\\"", type: ISSUE) { issueCount } # done\n}',
+                'query { search(query: "say \\"hi, # there\\"" type: ISSUE) { issueCount } }',
+            ),
+        ]
+        for query, expected in cases:
+            minified = minify_query(query)
+            if minified != expected:
+                print(f"  Expected {expected!r}, got {minified!r}")
+                return False
+            print(f"  Minified {minified!r}")
+
+        print("Query minification test successful!\n")
+        return True
+
+    except Exception as e:
+        print(f"  Minification error: {e}")
+        return False
+
+
+def test_batching():
+    """Test that queries are split, merged and answered per operation."""
+    print("Testing query batching...")
+
+    import asyncio
+
+    from src.tools.repo import repo_reader
+    from src.utils import github_client
+
+    post = github_client._post
+    try:
+        for name in dir(repo_reader):
+            if name.endswith("_QUERY"):
+                if github_client._split_operation(github_client.minify_query(getattr(repo_reader, name))) is None:
+                    print(f"  {name} can't be batched")
+                    return False
+                print(f"  {name} can be batched")
+
+        for query in [
+            "query Q($owner: String!) { repo: repository(owner: $owner, name: \"x\") { name } }",
+            "query Q { viewer { login } rateLimit { remaining } }",
+        ]:
+            if github_client._split_operation(github_client.minify_query(query)) is not None:
+                print(f"  Unbatchable query accepted: {query}")
+                return False
+        print("  Aliased and multi-field queries left unbatched")
+
+        queries = [
+            "query A($owner: String!) { repository(owner: $owner, name: \"a\") { name } }",
+            "query B($login: String!) { user(login: $login) { name } }",
+        ]
+        variables = [{"owner": "octocat"}, {"login": "octocat"}]
+        calls = []
+
+        async def fake_post(query, query_variables):
+            calls.append((query, query_variables))
+            if not query.startswith("query Batched"):
+                field = github_client._split_operation(query)[1]
+                return {"data": {field: {"name": "alone"}}}, 40
+            if pathless:
+                return {"data": None, "errors": [{"message": "Query has complexity too high"}]}, 70
+            return {
+                "data": {"op0": {"name": "a"}, "op1": None},
+                "errors": [{"message": "Not found", "path": ["op1"]}],
+            }, 100
+
+        async def dispatch():
+            loop = asyncio.get_running_loop()
+            batch = [
+                (github_client._split_operation(query), query_variables, query, loop.create_future())
+                for query, query_variables in zip(queries, variables)
+            ]
+            await github_client._GraphQLBatcher()._dispatch(batch)
+            return [entry[3].result() for entry in batch]
+
+        github_client._post = fake_post
+
+        pathless = False
+        results = asyncio.run(dispatch())
+        merged_query, merged_variables = calls[0]
+        if (
+            len(calls) != 1
+            or "($op0_owner: String!, $op1_login: String!)" not in merged_query
+            or "op0: repository(owner: $op0_owner" not in merged_query
+            or "op1: user(login: $op1_login)" not in merged_query
+            or merged_variables != {"op0_owner": "octocat", "op1_login": "octocat"}
+        ):
+            print(f"  Unexpected merged request: {calls}")
+            return False
+        print("  Queries merged with prefixed variables")
+
+        if results != [
+            ({"data": {"repository": {"name": "a"}}}, 50),
+            ({"data": {"user": None}, "errors": [{"message": "Not found", "path": ["op1"]}]}, 50),
+        ]:
+            print(f"  Unexpected split results: {results}")
+            return False
+        print("  Response split per query with path-scoped errors")
+
+        pathless = True
+        calls.clear()
+        results = asyncio.run(dispatch())
+        if [query for query, _ in calls[1:]] != queries or results != [
+            ({"data": {"repository": {"name": "alone"}}}, 40),
+            ({"data": {"user": {"name": "alone"}}}, 40),
+        ]:
+            print(f"  Unexpected resend after pathless error: {calls}")
+            return False
+        print("  Queries resent alone after a pathless error")
+
+        print("Query batching test successful!\n")
+        return True
+
+    except Exception as e:
+        print(f"  Batching error: {e}")
+        return False
+    finally:
+        github_client._post = post
+
+
+def test_usage_log():
+    """Test that a torn usage log line doesn't block compaction."""
+    print("Testing usage log recovery...")
+
+    import tempfile
+    from pathlib import Path
+
+    from src.utils import storage
+    from src.middleware import usage_middleware
+
+    tool_name = "torn_log_check"
+    base_dir = storage._BASE_DIR
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            storage._BASE_DIR = Path(tmp_dir)
+            storage._resolve_path.cache_clear()
+            schema = usage_middleware._usage_schema(tool_name)
+
+            usage_middleware._log_events(tool_name, [(tool_name, 1.0, 1.0, True, None, None)])
+            # Simulate a write cut short by a crash or a full disk
+            with open(storage.get_log_path(schema), "ab") as f:
+                f.write(b'{"ts": 2.0, "dt"')
+            usage_middleware._log_events(tool_name, [(tool_name, 3.0, 3.0, False, "boom", None)])
+
+            if usage_middleware.flush_usage_stats() != 1 or tool_name in usage_middleware._dirty:
+                print("  Compaction blocked by torn line")
+                return False
+            print("  Torn line skipped during compaction")
+
+            stats = storage.load_from_database(schema)["data"]
+            if stats["total_calls"] != 2 or stats["failed_calls"] != 1:
+                print(f"  Unexpected stats: {stats}")
+                return False
+            print("  Records around the torn line kept")
+
+            if storage.get_log_path(schema).stat().st_size:
+                print("  Log not truncated after compaction")
+                return False
+            print("  Log truncated")
+
+        print("Usage log recovery test successful!\n")
+        return True
+
+    except Exception as e:
+        print(f"  Usage log error: {e}")
+        return False
+    finally:
+        storage._BASE_DIR = base_dir
+        storage._resolve_path.cache_clear()
+        usage_middleware._stats_cache.pop(tool_name, None)
+        usage_middleware._dirty.discard(tool_name)
+
+
 def test_file_structure():
     """Test that all required files exist."""
     print("Testing file structure...")
@@ -129,19 +365,31 @@ def test_file_structure():
         "src/tools/repo/__init__.py",
         "src/tools/repo/repo_tools.py",
         "src/tools/repo/repo_reader.py",
+        "src/tools/repo/models.py",
         "src/utils/__init__.py",
         "src/utils/config.py",
+        "src/utils/fastuuid.py",
         "src/utils/logging.py",
+        "src/utils/request_context.py",
         "src/utils/github_client.py",
+        "src/utils/json_codec.py",
         "src/utils/storage.py",
     ]
 
     base_dir = os.path.dirname(__file__)
     all_exist = True
 
+    # List each directory once instead of stat-ing every file
+    listings = {}
+    for directory in {os.path.dirname(file_path) for file_path in required_files}:
+        try:
+            listings[directory] = set(os.listdir(os.path.join(base_dir, directory) or "."))
+        except FileNotFoundError:
+            listings[directory] = set()
+
     for file_path in required_files:
-        full_path = os.path.join(base_dir, file_path)
-        if os.path.exists(full_path):
+        directory, name = os.path.split(file_path)
+        if name in listings[directory]:
             print(f"  {file_path}")
         else:
             print(f"  MISSING: {file_path}")
@@ -167,6 +415,10 @@ def main():
         "Imports": test_imports(),
         "Configuration": test_config(),
         "Server Initialization": test_server_initialization(),
+        "Argument Validation": test_validation(),
+        "Query Minification": test_minify_query(),
+        "Query Batching": test_batching(),
+        "Usage Log Recovery": test_usage_log(),
     }
 
     print("=" * 60)